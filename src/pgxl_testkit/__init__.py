@@ -1,7 +1,40 @@
-__all__=['__version__']
-__version__='0.2.0'
-# Re-export device classes for convenient import
-from .devices.pgxl import PGXL
-from .devices.flex import FlexRadio
+__version__ = '0.2.0'
+__all__ = ("PGXL", "FlexRadio", "__version__")
 
-__all__ = ["PGXL", "FlexRadio"]
+import importlib.util
+import sys
+
+# Device classes are re-exported lazily so console scripts don't import the
+# device modules just to print --help. The submodules are registered through
+# LazyLoader, so sys.modules holds the real module objects from the start and
+# their code runs on first attribute access.
+_LAZY = {
+    "PGXL": ".devices.pgxl",
+    "FlexRadio": ".devices.flex",
+}
+
+def _lazy_module(relname: str):
+    fullname = importlib.util.resolve_name(relname, __name__)
+    if fullname in sys.modules:
+        return sys.modules[fullname]
+    spec = importlib.util.find_spec(fullname)
+    spec.loader = importlib.util.LazyLoader(spec.loader)
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[fullname] = module
+    spec.loader.exec_module(module)
+    parent, _, child = fullname.rpartition(".")
+    setattr(sys.modules[parent], child, module)
+    return module
+
+for _relname in _LAZY.values():
+    _lazy_module(_relname)
+
+def __getattr__(name: str):
+    if name in _LAZY:
+        obj = getattr(_lazy_module(_LAZY[name]), name)
+        globals()[name] = obj
+        return obj
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
@@ -0,0 +1,11 @@
+from types import MappingProxyType
+from typing import Final, Mapping
+
+# Amateur bands the kit supports, wavelength (m) -> tune target (MHz), longest
+# first. Single source for the Flex tune centers, the CLI band choices and the
+# default suite band list; stdlib-only so the argparse CLI can import it cheaply.
+# Read-only, since every importer shares the one table.
+BAND_CENTERS_MHZ: Final[Mapping[int, float]] = MappingProxyType({
+    160: 1.900, 80: 3.750, 60: 5.358, 40: 7.150, 30: 10.125,
+    20: 14.175, 17: 18.118, 15: 21.225, 12: 24.940, 10: 28.850, 6: 50.500
+})
@@ -0,0 +1,82 @@
+from __future__ import annotations
+import json
+import sys
+import time
+from typing import Any, Callable, Iterable, List, Tuple
+
+from .bands import BAND_CENTERS_MHZ
+
+# Shared by both pgxl-dev front ends (cli_devices_fast and the Typer app in
+# cli_devices). Stdlib-only, so importing it keeps the fast path light.
+
+# Accepted values; both front ends reject typos against them before any device
+# module is imported or a connection is opened.
+MODE_CHOICES = ["CW", "USB", "LSB", "AM", "SAM", "FM", "NFM", "DFM", "DIGU", "DIGL", "RTTY"]
+BAND_CHOICES = [str(b) for b in BAND_CENTERS_MHZ]
+BAND_HELP = ", ".join(BAND_CHOICES)
+BIAS_CHOICES = ["AB", "AAB"]
+
+def norm(s: str) -> str:
+    return s.strip().upper()
+
+def dump_json(data) -> str:
+    """Pretty JSON for a terminal, compact JSON when piped (e.g. polling scripts)."""
+    pretty = sys.stdout.isatty()
+    try:
+        import orjson
+    except ImportError:
+        if pretty:
+            return json.dumps(data, indent=2)
+        return json.dumps(data, separators=(",", ":"))
+    return orjson.dumps(data, option=orjson.OPT_INDENT_2 if pretty else 0).decode()
+
+# ---------- flex script ----------
+# One command per line, same names as the flex subcommands; '#' starts a comment.
+SCRIPT_USAGE = "mode <MODE> | band <m> | drive <W> | two-tone on|off | tune-on | tune-off | sleep <s>"
+
+_SCRIPT_ACTIONS = {
+    "mode": lambda r, v: r.set_mode(v),
+    "band": lambda r, v: r.set_band(v),
+    "drive": lambda r, v: r.set_drive_w(v),
+    "two-tone": lambda r, v: r.set_two_tone(v),
+    "tune-on": lambda r, v: r.key_carrier_on(),
+    "tune-off": lambda r, v: r.key_carrier_off(),
+    "sleep": lambda r, v: time.sleep(v),
+}
+
+def parse_script(lines: Iterable[str]) -> List[Tuple[str, Any]]:
+    """Validate a whole script up front so a typo can't leave the radio half-configured."""
+    steps: List[Tuple[str, Any]] = []
+    for n, raw in enumerate(lines, 1):
+        line = raw.split("#", 1)[0].strip()
+        if not line:
+            continue
+        cmd, *args = line.split()
+        cmd = cmd.lower()
+        arg = args[0] if len(args) == 1 else None
+        if cmd == "mode" and arg and norm(arg) in MODE_CHOICES:
+            steps.append((cmd, norm(arg)))
+        elif cmd == "band" and arg in BAND_CHOICES:
+            steps.append((cmd, int(arg)))
+        elif cmd in ("drive", "sleep") and arg and arg.replace(".", "", 1).isdigit():
+            steps.append((cmd, float(arg)))
+        elif cmd == "two-tone" and arg and arg.lower() in ("on", "off"):
+            steps.append((cmd, arg.lower() == "on"))
+        elif cmd in ("tune-on", "tune-off") and not args:
+            steps.append((cmd, None))
+        else:
+            raise ValueError(f"line {n}: cannot parse {line!r} (expected {SCRIPT_USAGE})")
+    return steps
+
+def read_script(path: str) -> List[Tuple[str, Any]]:
+    if path == "-":
+        return parse_script(sys.stdin)
+    with open(path, encoding="utf-8") as f:
+        return parse_script(f)
+
+def run_script(r, steps: List[Tuple[str, Any]], echo: Callable[[str], None]) -> None:
+    for cmd, arg in steps:
+        ack = _SCRIPT_ACTIONS[cmd](r, arg)
+        if isinstance(ack, str):
+            echo(ack)
+    echo(f"Script complete ({len(steps)} commands).")
@@ -1,152 +1,308 @@
 ﻿from __future__ import annotations
 import json
+import signal
+import sys
+import threading
 import typer
 import time
-from typing import Optional
-from .devices.pgxl import PGXL
-from .devices.flex import FlexRadio
+from contextlib import ExitStack
+from enum import Enum
+from typing import Callable, List, Optional
+from .cli_common import BAND_CHOICES, BAND_HELP, BIAS_CHOICES, MODE_CHOICES, SCRIPT_USAGE, dump_json, read_script, run_script
 
-app = typer.Typer(help="PGXL & FlexRadio device controls")
+# Slice modes in which SmartSDR will generate a two-tone test signal
+_TWO_TONE_MODES = frozenset({"USB", "LSB", "DIGU", "DIGL", "SAM"})
 
-pgxl_app = typer.Typer(help="Control the Power Genius XL amplifier")
-flex_app = typer.Typer(help="Control the FlexRadio via TCP (SmartSDR)")
-
-app.add_typer(pgxl_app, name="pgxl")
-app.add_typer(flex_app, name="flex")
+# Enum-typed parameters make Typer reject bad values before a command body runs
+FlexMode = Enum("FlexMode", {m: m for m in MODE_CHOICES}, type=str)
+Band = Enum("Band", {b: b for b in BAND_CHOICES}, type=str)
+Bias = Enum("Bias", {b: b for b in BIAS_CHOICES}, type=str)
 
 # ---------- PGXL ----------
-@pgxl_app.command("status")
 def pgxl_status(amp_host: str = typer.Option(..., "--amp-host", help="PGXL IP"),
                 amp_port: int = typer.Option(9008, "--amp-port", help="PGXL TCP port")):
-    amp = PGXL(amp_host, amp_port)
-    amp.connect()
-    data = amp.telemetry()
-    amp.disconnect()
-    typer.echo(json.dumps(data, indent=2))
+    from .devices import _pool
+    with _pool.pgxl(amp_host, amp_port) as amp:
+        data = amp.telemetry()
+    typer.echo(dump_json(data))
 
-@pgxl_app.command("operate")
 def pgxl_operate(amp_host: str = typer.Option(..., "--amp-host"),
                  amp_port: int = typer.Option(9008, "--amp-port")):
-    amp = PGXL(amp_host, amp_port); amp.connect(); amp.operate(); amp.disconnect()
+    from .devices import _pool
+    with _pool.pgxl(amp_host, amp_port) as amp:
+        amp.operate()
     typer.echo("PGXL set to OPERATE")
 
-@pgxl_app.command("standby")
 def pgxl_standby(amp_host: str = typer.Option(..., "--amp-host"),
                  amp_port: int = typer.Option(9008, "--amp-port")):
-    amp = PGXL(amp_host, amp_port); amp.connect(); amp.standby(); amp.disconnect()
+    from .devices import _pool
+    with _pool.pgxl(amp_host, amp_port) as amp:
+        amp.standby()
     typer.echo("PGXL set to STANDBY")
 
-@pgxl_app.command("bias")
-def pgxl_bias(mode: str = typer.Argument(..., help="AB or AAB"),
+def pgxl_bias(mode: Bias = typer.Argument(..., help="AB or AAB", case_sensitive=False),
               amp_host: str = typer.Option(..., "--amp-host"),
               amp_port: int = typer.Option(9008, "--amp-port")):
-    amp = PGXL(amp_host, amp_port); amp.connect(); amp.set_mode(mode); amp.disconnect()
-    typer.echo(f"PGXL bias set to {mode.upper()}")
+    from .devices import _pool
+    with _pool.pgxl(amp_host, amp_port) as amp:
+        amp.set_mode(mode.value)
+    typer.echo(f"PGXL bias set to {mode.value}")
 
-@pgxl_app.command("band")
-def pgxl_band(band_m: str = typer.Argument(..., help="160, 80, 60, 40, 30, 20, 17, 15, 12, 10, 6"),
+def pgxl_band(band_m: Band = typer.Argument(..., help=BAND_HELP),
               amp_host: str = typer.Option(..., "--amp-host"),
               amp_port: int = typer.Option(9008, "--amp-port")):
-    amp = PGXL(amp_host, amp_port); amp.connect(); amp.set_band(band_m); amp.disconnect()
-    typer.echo(f"PGXL bandA set to {band_m}m")
+    from .devices import _pool
+    with _pool.pgxl(amp_host, amp_port) as amp:
+        amp.set_band(band_m.value)
+    typer.echo(f"PGXL bandA set to {band_m.value}m")
 
 # ---------- FlexRadio ----------
-@flex_app.command("mode")
-def flex_mode(mode: str = typer.Argument(..., help="CW, USB, LSB, AM, FM, DIGU, DIGL, etc."),
+def flex_mode(mode: FlexMode = typer.Argument(..., help="CW, USB, LSB, AM, FM, DIGU, DIGL, etc.", case_sensitive=False),
               flex_host: str = typer.Option(..., "--flex-host", help="FlexRadio IP"),
               flex_port: int = typer.Option(4992, "--flex-port")):
-    r = FlexRadio(flex_host, flex_port); r.connect(); r.set_mode(mode); r.disconnect()
-    typer.echo(f"FlexRadio mode set to {mode.upper()}")
+    from .devices import _pool
+    with _pool.acquire(flex_host, flex_port) as r:
+        r.set_mode(mode.value)
+    typer.echo(f"FlexRadio mode set to {mode.value}")
 
-@flex_app.command("band")
-def flex_band(band_m: int = typer.Argument(..., help="160, 80, 60, 40, 30, 20, 17, 15, 12, 10, 6"),
+def flex_band(band_m: Band = typer.Argument(..., help=BAND_HELP),
               flex_host: str = typer.Option(..., "--flex-host"),
               flex_port: int = typer.Option(4992, "--flex-port")):
-    r = FlexRadio(flex_host, flex_port); r.connect(); r.set_band(band_m); r.disconnect()
-    typer.echo(f"FlexRadio tuned to {band_m}m center")
+    from .devices import _pool
+    with _pool.acquire(flex_host, flex_port) as r:
+        r.set_band(int(band_m.value))
+    typer.echo(f"FlexRadio tuned to {band_m.value}m center")
 
-@flex_app.command("drive")
 def flex_drive(watts: float = typer.Argument(..., help="0-100 W → treated as % on 100W rig"),
                flex_host: str = typer.Option(..., "--flex-host"),
                flex_port: int = typer.Option(4992, "--flex-port")):
-    r = FlexRadio(flex_host, flex_port); r.connect(); r.set_drive_w(watts); r.disconnect()
+    from .devices import _pool
+    with _pool.acquire(flex_host, flex_port) as r:
+        r.set_drive_w(watts)
     typer.echo(f"FlexRadio drive/tunepower set ~= {int(watts)}%")
 
-@flex_app.command("tune-on")
 def flex_tune_on(flex_host: str = typer.Option(..., "--flex-host"),
                  flex_port: int = typer.Option(4992, "--flex-port")):
-    r = FlexRadio(flex_host, flex_port); r.connect(); r.key_carrier_on(); r.disconnect()
+    from .devices import _pool
+    with _pool.acquire(flex_host, flex_port) as r:
+        r.key_carrier_on()
     typer.echo("FlexRadio TUNE on")
 
-@flex_app.command("tune-off")
 def flex_tune_off(flex_host: str = typer.Option(..., "--flex-host"),
                   flex_port: int = typer.Option(4992, "--flex-port")):
-    r = FlexRadio(flex_host, flex_port); r.connect(); r.key_carrier_off(); r.disconnect()
+    from .devices import _pool
+    with _pool.acquire(flex_host, flex_port) as r:
+        r.key_carrier_off()
     typer.echo("FlexRadio TUNE off")
 
-if __name__ == "__main__":
-    app()
+def _on_each(radios: list, fn: Callable) -> list:
+    """Call fn(radio) for every radio, concurrently when there is more than one."""
+    if len(radios) == 1:
+        return [fn(radios[0])]
+    from concurrent.futures import ThreadPoolExecutor
+    with ThreadPoolExecutor(max_workers=len(radios)) as pool:
+        return list(pool.map(fn, radios))
 
-@flex_app.command("batch")
 def flex_batch(
-    flex_host: str = typer.Option(..., "--flex-host"),
+    flex_host: List[str] = typer.Option(..., "--flex-host", help="FlexRadio IP; repeat to apply the batch to several radios in parallel"),
     flex_port: int = typer.Option(4992, "--flex-port"),
-    mode: Optional[str] = typer.Option(None, "--mode", help="CW, USB, LSB, AM, FM, DIGU, DIGL, ..."),
-    band: Optional[int] = typer.Option(None, "--band", help="160,80,60,40,30,20,17,15,12,10,6"),
+    mode: Optional[FlexMode] = typer.Option(None, "--mode", help="CW, USB, LSB, AM, FM, DIGU, DIGL, ...", case_sensitive=False),
+    band: Optional[Band] = typer.Option(None, "--band", help=BAND_HELP),
     drive: Optional[float] = typer.Option(None, "--drive", help="0-100 (treated as %)"),
     two_tone: Optional[bool] = typer.Option(None, "--two-tone/--no-two-tone", help="Enable/disable two-tone"),
     tune_on: bool = typer.Option(False, "--tune-on", help="Enable TUNE carrier at end"),
     tune_off: bool = typer.Option(False, "--tune-off", help="Disable TUNE carrier at end"),
     hold: float = typer.Option(0.0, "--hold", help="Keep connection open. Seconds (>0) or -1 to hold until Ctrl-C."),
+    amp_host: Optional[str] = typer.Option(None, "--amp-host", help="PGXL IP; print its telemetry as JSON lines during --hold"),
+    amp_port: int = typer.Option(9008, "--amp-port"),
+    sample_every: float = typer.Option(0.25, "--sample-every", help="Seconds between PGXL samples during --hold"),
 ):
-    r = FlexRadio(flex_host, flex_port)
-    r.connect()
-    tune_was_on = False
-    try:
-        if mode is not None:
-            r.set_mode(mode)
-        if band is not None:
-            r.set_band(band)
-        if drive is not None:
-            r.set_drive_w(drive)
-        if two_tone is not None:
-            r.set_two_tone(two_tone)
-
-        if tune_on and tune_off:
-            typer.echo("Ignoring --tune-off because --tune-on also set.")
-            tune_off = False
+    from .devices import _broker, _pool
+    if two_tone and mode and mode.value not in _TWO_TONE_MODES:
+        typer.echo(f"Ignoring --two-tone because mode {mode.value} does not support it.")
+        two_tone = None
+    if tune_on and tune_off:
+        typer.echo("Ignoring --tune-off because --tune-on also set.")
+        tune_off = False
+
+    def apply(r) -> Optional[str]:
+        with r.batched():
+            r.apply(band_m=int(band.value) if band is not None else None,
+                    mode=mode.value if mode is not None else None,
+                    drive_w=drive)
+            if two_tone is not None:
+                r.set_two_tone(two_tone)
+            if tune_on:
+                return r.key_carrier_on()
+            if tune_off:
+                return r.key_carrier_off()
+        return None
 
+    def echo_acks(acks: list, fallback: str) -> None:
+        for r, ack in zip(radios, acks):
+            msg = ack or fallback
+            typer.echo(f"{r.host}: {msg}" if len(radios) > 1 else msg)
+
+    with ExitStack() as stack:
+        radios = [stack.enter_context(_pool.acquire(h, flex_port)) for h in flex_host]
+        amp = stack.enter_context(_pool.pgxl(amp_host, amp_port)) if amp_host else None
+        acks = _on_each(radios, apply)
+        # the hold budget runs from when the settings landed, not from after the echoes
+        t_applied = time.monotonic()
         if tune_on:
-            ack = r.key_carrier_on()
-            tune_was_on = True
-            typer.echo(ack or "TUNE on")
+            echo_acks(acks, "TUNE on")
         elif tune_off:
-            ack = r.key_carrier_off()
-            typer.echo(ack or "TUNE off")
+            echo_acks(acks, "TUNE off")
 
-        # keep the client alive so TUNE stays asserted, and auto TUNE OFF after hold
-        if hold < 0:
-            typer.echo("Holding connection until Ctrl-C…")
+        # keep the clients alive so TUNE stays asserted, and auto TUNE OFF after hold
+        if hold:
+            if hold < 0:
+                typer.echo("Holding connection until Ctrl-C…")
+            else:
+                typer.echo(f"Holding connection for {hold:.1f}s…")
+            # one wait for the whole hold, cut short by Ctrl-C so TUNE still gets switched off;
+            # with --amp-host the wait is sliced so PGXL telemetry is sampled under load
+            stop = threading.Event()
+            prev = signal.signal(signal.SIGINT, lambda *_: stop.set())
+            held = False
             try:
-                while True:
-                    time.sleep(1.0)
-            except KeyboardInterrupt:
-                if tune_was_on:
-                    ack = r.key_carrier_off()
-                    typer.echo(ack or "TUNE off (on exit)")
-        elif hold > 0:
-            typer.echo(f"Holding connection for {hold:.1f}s…")
-            time.sleep(hold)
-            if tune_was_on:
-                ack = r.key_carrier_off()
-                typer.echo(ack or "TUNE off (after hold)")
-        else:
-            if tune_on:
+                while not stop.is_set():
+                    remaining = None if hold < 0 else t_applied + hold - time.monotonic()
+                    if remaining is not None and remaining <= 0:
+                        held = True
+                        break
+                    if amp is None:
+                        stop.wait(remaining)
+                        continue
+                    t = round(time.monotonic() - t_applied, 3)
+                    try:
+                        typer.echo(json.dumps({"t": t, **amp.telemetry()}, separators=(",", ":")))
+                    except (OSError, RuntimeError) as e:
+                        # a missed reading must not end the hold with the carrier still keyed
+                        typer.echo(f"t={t}: PGXL telemetry failed: {e!r}", err=True)
+                    stop.wait(sample_every if remaining is None else min(sample_every, remaining))
+            finally:
+                signal.signal(signal.SIGINT, prev)
+                # whatever ended the hold, never leave TUNE asserted into the amp
+                if tune_on:
+                    done = "TUNE off (after hold)" if held else "TUNE off (on exit)"
+                    echo_acks(_on_each(radios, lambda r: r.key_carrier_off()), done)
+        elif tune_on:
+            if any(isinstance(r, _broker.FlexProxy) for r in radios):
+                typer.echo("Note: TUNE stays on; the session daemon keeps the radio connected. Run 'flex tune-off' to drop it.")
+            else:
                 typer.echo("Note: TUNE will drop when the client disconnects. Use --hold to keep it on then auto-off.")
 
-    finally:
-        r.disconnect()
     typer.echo("Batch complete.")
 
+def flex_script(file: str = typer.Argument("-", help=f"Script path, or - for stdin. Lines: {SCRIPT_USAGE}"),
+                flex_host: str = typer.Option(..., "--flex-host"),
+                flex_port: int = typer.Option(4992, "--flex-port")):
+    """Run commands from a file or stdin over one connection."""
+    try:
+        steps = read_script(file)
+    except (OSError, ValueError) as e:
+        typer.echo(str(e), err=True)
+        raise typer.Exit(code=1)
+    from .devices import _pool
+    with _pool.acquire(flex_host, flex_port) as r:
+        run_script(r, steps, typer.echo)
+
+# ---------- session daemons ----------
+def _no_pool(no_pool: bool = typer.Option(False, "--no-pool", help="Connect directly even if a session daemon is running")):
+    if no_pool:
+        from .devices import _pool
+        _pool.USE_BROKER = False
+
+def _daemon_start(kind: str, host: str, port: int, idle: float) -> None:
+    from .devices import _broker
+    if not _broker.start(kind, host, port, idle):
+        typer.echo(f"Session daemon for {host}:{port} did not come up.", err=True)
+        raise typer.Exit(code=1)
+    typer.echo(f"Session daemon for {host}:{port} listening on {_broker.socket_path(kind, host, port)}")
 
+def _daemon_stop(kind: str, host: str, port: int) -> None:
+    from .devices import _broker
+    if _broker.stop(kind, host, port):
+        typer.echo(f"Session daemon for {host}:{port} stopped")
+    else:
+        typer.echo(f"No session daemon running for {host}:{port}")
 
+def pgxl_daemon_start(amp_host: str = typer.Option(..., "--amp-host"),
+                      amp_port: int = typer.Option(9008, "--amp-port"),
+                      idle: float = typer.Option(600.0, "--idle", help="Exit after this many idle seconds")):
+    _daemon_start("pgxl", amp_host, amp_port, idle)
+
+def pgxl_daemon_stop(amp_host: str = typer.Option(..., "--amp-host"),
+                     amp_port: int = typer.Option(9008, "--amp-port")):
+    _daemon_stop("pgxl", amp_host, amp_port)
+
+def flex_daemon_start(flex_host: str = typer.Option(..., "--flex-host"),
+                      flex_port: int = typer.Option(4992, "--flex-port"),
+                      idle: float = typer.Option(600.0, "--idle", help="Exit after this many idle seconds")):
+    _daemon_start("flex", flex_host, flex_port, idle)
+
+def flex_daemon_stop(flex_host: str = typer.Option(..., "--flex-host"),
+                     flex_port: int = typer.Option(4992, "--flex-port")):
+    _daemon_stop("flex", flex_host, flex_port)
+
+# ---------- Typer wiring ----------
+_PGXL_COMMANDS = (
+    ("status", pgxl_status),
+    ("operate", pgxl_operate),
+    ("standby", pgxl_standby),
+    ("bias", pgxl_bias),
+    ("band", pgxl_band),
+    ("daemon-start", pgxl_daemon_start),
+    ("daemon-stop", pgxl_daemon_stop),
+)
+_FLEX_COMMANDS = (
+    ("mode", flex_mode),
+    ("band", flex_band),
+    ("drive", flex_drive),
+    ("tune-on", flex_tune_on),
+    ("tune-off", flex_tune_off),
+    ("batch", flex_batch),
+    ("script", flex_script),
+    ("daemon-start", flex_daemon_start),
+    ("daemon-stop", flex_daemon_stop),
+)
+# Typer silently lets a later command shadow an earlier one with the same name
+for _table in (_PGXL_COMMANDS, _FLEX_COMMANDS):
+    _names = [name for name, _ in _table]
+    assert len(_names) == len(set(_names)), f"duplicate command names: {_names}"
+
+def _sniff_subcommand(argv: list[str]) -> Optional[str]:
+    """Return the sub-app named on the command line, or None for root-level calls."""
+    if len(argv) > 1 and argv[1] in ("pgxl", "flex"):
+        return argv[1]
+    return None
+
+def _build_app(subcommand: Optional[str] = None) -> typer.Typer:
+    """Compose the Typer app. Only the named sub-app is attached, so Click builds
+    parsers for one tree; with no subcommand (root --help) both are attached."""
+    app = typer.Typer(help="PGXL & FlexRadio device controls")
+    if subcommand in (None, "pgxl"):
+        pgxl_app = typer.Typer(help="Control the Power Genius XL amplifier", callback=_no_pool)
+        for name, func in _PGXL_COMMANDS:
+            pgxl_app.command(name)(func)
+        app.add_typer(pgxl_app, name="pgxl")
+    if subcommand in (None, "flex"):
+        flex_app = typer.Typer(help="Control the FlexRadio via TCP (SmartSDR)", callback=_no_pool)
+        for name, func in _FLEX_COMMANDS:
+            flex_app.command(name)(func)
+        app.add_typer(flex_app, name="flex")
+    return app
+
+def __getattr__(name: str):
+    # `app` is kept for callers that import it; it is built on first access
+    if name == "app":
+        return _build_app(_sniff_subcommand(sys.argv))
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+def main(argv: Optional[list[str]] = None, prog_name: Optional[str] = None) -> None:
+    argv = sys.argv[1:] if argv is None else argv
+    _build_app(_sniff_subcommand(["", *argv]))(args=argv, prog_name=prog_name)
+
+if __name__ == "__main__":
+    main()
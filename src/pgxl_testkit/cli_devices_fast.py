@@ -0,0 +1,174 @@
+from __future__ import annotations
+import argparse
+import sys
+from typing import List, Optional
+
+from .cli_common import BAND_CHOICES, BAND_HELP, BIAS_CHOICES, MODE_CHOICES, SCRIPT_USAGE, dump_json, norm, read_script, run_script
+
+# Stdlib-only front end for pgxl-dev. The flat device commands are parsed with
+# argparse so --help and usage errors never import Typer/Click/rich; the
+# option-heavy `flex batch` is handed to the Typer app in cli_devices.
+
+# ---------- PGXL ----------
+def _pgxl_status(a: argparse.Namespace) -> None:
+    from .devices import _pool
+    with _pool.pgxl(a.amp_host, a.amp_port) as amp:
+        data = amp.telemetry()
+    print(dump_json(data))
+
+def _pgxl_operate(a: argparse.Namespace) -> None:
+    from .devices import _pool
+    with _pool.pgxl(a.amp_host, a.amp_port) as amp:
+        amp.operate()
+    print("PGXL set to OPERATE")
+
+def _pgxl_standby(a: argparse.Namespace) -> None:
+    from .devices import _pool
+    with _pool.pgxl(a.amp_host, a.amp_port) as amp:
+        amp.standby()
+    print("PGXL set to STANDBY")
+
+def _pgxl_bias(a: argparse.Namespace) -> None:
+    from .devices import _pool
+    with _pool.pgxl(a.amp_host, a.amp_port) as amp:
+        amp.set_mode(a.mode)
+    print(f"PGXL bias set to {a.mode}")
+
+def _pgxl_band(a: argparse.Namespace) -> None:
+    from .devices import _pool
+    with _pool.pgxl(a.amp_host, a.amp_port) as amp:
+        amp.set_band(a.band_m)
+    print(f"PGXL bandA set to {a.band_m}m")
+
+# ---------- FlexRadio ----------
+def _flex_mode(a: argparse.Namespace) -> None:
+    from .devices import _pool
+    with _pool.acquire(a.flex_host, a.flex_port) as r:
+        r.set_mode(a.mode)
+    print(f"FlexRadio mode set to {a.mode}")
+
+def _flex_band(a: argparse.Namespace) -> None:
+    from .devices import _pool
+    with _pool.acquire(a.flex_host, a.flex_port) as r:
+        r.set_band(int(a.band_m))
+    print(f"FlexRadio tuned to {a.band_m}m center")
+
+def _flex_drive(a: argparse.Namespace) -> None:
+    from .devices import _pool
+    with _pool.acquire(a.flex_host, a.flex_port) as r:
+        r.set_drive_w(a.watts)
+    print(f"FlexRadio drive/tunepower set ~= {int(a.watts)}%")
+
+def _flex_tune_on(a: argparse.Namespace) -> None:
+    from .devices import _pool
+    with _pool.acquire(a.flex_host, a.flex_port) as r:
+        r.key_carrier_on()
+    print("FlexRadio TUNE on")
+
+def _flex_tune_off(a: argparse.Namespace) -> None:
+    from .devices import _pool
+    with _pool.acquire(a.flex_host, a.flex_port) as r:
+        r.key_carrier_off()
+    print("FlexRadio TUNE off")
+
+def _flex_script(a: argparse.Namespace) -> None:
+    try:
+        steps = read_script(a.file)
+    except (OSError, ValueError) as e:
+        sys.exit(str(e))
+    from .devices import _pool
+    with _pool.acquire(a.flex_host, a.flex_port) as r:
+        run_script(r, steps, print)
+
+# ---------- session daemons ----------
+def _daemon_start(kind: str, host: str, port: int, idle: float) -> None:
+    from .devices import _broker
+    if not _broker.start(kind, host, port, idle):
+        sys.exit(f"Session daemon for {host}:{port} did not come up.")
+    print(f"Session daemon for {host}:{port} listening on {_broker.socket_path(kind, host, port)}")
+
+def _daemon_stop(kind: str, host: str, port: int) -> None:
+    from .devices import _broker
+    if _broker.stop(kind, host, port):
+        print(f"Session daemon for {host}:{port} stopped")
+    else:
+        print(f"No session daemon running for {host}:{port}")
+
+def _pgxl_daemon_start(a: argparse.Namespace) -> None:
+    _daemon_start("pgxl", a.amp_host, a.amp_port, a.idle)
+
+def _pgxl_daemon_stop(a: argparse.Namespace) -> None:
+    _daemon_stop("pgxl", a.amp_host, a.amp_port)
+
+def _flex_daemon_start(a: argparse.Namespace) -> None:
+    _daemon_start("flex", a.flex_host, a.flex_port, a.idle)
+
+def _flex_daemon_stop(a: argparse.Namespace) -> None:
+    _daemon_stop("flex", a.flex_host, a.flex_port)
+
+def _build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="pgxl-dev", description="PGXL & FlexRadio device controls")
+    sub = parser.add_subparsers(dest="device", metavar="{pgxl,flex}", required=True)
+
+    pgxl = sub.add_parser("pgxl", help="Control the Power Genius XL amplifier")
+    pgxl.add_argument("--no-pool", action="store_true",
+                      help="Connect directly even if a session daemon is running")
+    pgxl_sub = pgxl.add_subparsers(dest="command", required=True)
+
+    def pgxl_cmd(name: str, func, help: Optional[str] = None) -> argparse.ArgumentParser:
+        p = pgxl_sub.add_parser(name, help=help)
+        p.add_argument("--amp-host", required=True, help="PGXL IP")
+        p.add_argument("--amp-port", type=int, default=9008, help="PGXL TCP port")
+        p.set_defaults(func=func)
+        return p
+
+    pgxl_cmd("status", _pgxl_status, "Print PGXL telemetry as JSON")
+    pgxl_cmd("operate", _pgxl_operate)
+    pgxl_cmd("standby", _pgxl_standby)
+    pgxl_cmd("bias", _pgxl_bias).add_argument("mode", type=norm, choices=BIAS_CHOICES, help="AB or AAB")
+    pgxl_cmd("band", _pgxl_band).add_argument("band_m", choices=BAND_CHOICES, help=BAND_HELP)
+    pgxl_cmd("daemon-start", _pgxl_daemon_start, "Keep a PGXL session open in a background process").add_argument(
+        "--idle", type=float, default=600.0, help="Exit after this many idle seconds")
+    pgxl_cmd("daemon-stop", _pgxl_daemon_stop)
+
+    flex = sub.add_parser("flex", help="Control the FlexRadio via TCP (SmartSDR)")
+    flex.add_argument("--no-pool", action="store_true",
+                      help="Connect directly even if a session daemon is running")
+    flex_sub = flex.add_subparsers(dest="command", required=True)
+
+    def flex_cmd(name: str, func, help: Optional[str] = None) -> argparse.ArgumentParser:
+        p = flex_sub.add_parser(name, help=help)
+        p.add_argument("--flex-host", required=True, help="FlexRadio IP")
+        p.add_argument("--flex-port", type=int, default=4992)
+        p.set_defaults(func=func)
+        return p
+
+    flex_cmd("mode", _flex_mode).add_argument("mode", type=norm, choices=MODE_CHOICES, help="CW, USB, LSB, AM, FM, DIGU, DIGL, etc.")
+    flex_cmd("band", _flex_band).add_argument("band_m", choices=BAND_CHOICES, help=BAND_HELP)
+    flex_cmd("drive", _flex_drive).add_argument("watts", type=float, help="0-100 W → treated as % on 100W rig")
+    flex_cmd("tune-on", _flex_tune_on)
+    flex_cmd("tune-off", _flex_tune_off)
+    flex_cmd("script", _flex_script, "Run commands from a file or stdin over one connection").add_argument(
+        "file", nargs="?", default="-", help=f"Script path, or - for stdin. Lines: {SCRIPT_USAGE}")
+    flex_cmd("daemon-start", _flex_daemon_start, "Keep a FlexRadio session open in a background process").add_argument(
+        "--idle", type=float, default=600.0, help="Exit after this many idle seconds")
+    flex_cmd("daemon-stop", _flex_daemon_stop)
+    # parsed by the Typer app; listed here so it shows up in `flex --help`
+    flex_sub.add_parser("batch", help="Apply several settings over one connection (see 'flex batch --help')")
+    return parser
+
+def main(argv: Optional[List[str]] = None) -> None:
+    argv = sys.argv[1:] if argv is None else argv
+    command = next((t for t in argv[1:] if not t.startswith("-")), None)
+    if argv[:1] == ["flex"] and command == "batch":
+        from .cli_devices import main as typer_main
+        typer_main(argv, prog_name="pgxl-dev")
+        return
+    args = _build_parser().parse_args(argv)
+    if args.no_pool:
+        from .devices import _pool
+        _pool.USE_BROKER = False
+    args.func(args)
+
+if __name__ == "__main__":
+    main()
@@ -1,31 +1,59 @@
 
-from pydantic import BaseModel, Field
-from typing import Optional, List
-import yaml, pathlib
+from pydantic import BaseModel, ConfigDict, Field, TypeAdapter
+from typing import Optional, Tuple
+from collections import OrderedDict
+import os, pathlib
 
-class VISAConfig(BaseModel):
+from .bands import BAND_CENTERS_MHZ
+
+class _Frozen(BaseModel):
+    # load_config hands the same cached instance to every caller, so configs are
+    # immutable; unknown YAML keys are dropped rather than stored
+    model_config = ConfigDict(frozen=True, extra="ignore")
+
+class VISAConfig(_Frozen):
     resource: Optional[str] = Field(None, description="VISA resource string, e.g. TCPIP0::192.168.1.50::INSTR")
     timeout_ms: int = Field(5000)
 
-class VNAConfig(BaseModel):
+class VNAConfig(_Frozen):
     vendor: str = Field("siglent", description="siglent or rigol")
     visa: VISAConfig = Field(default_factory=VISAConfig)
 
-class PGXLConfig(BaseModel):
+class PGXLConfig(_Frozen):
     host: str = Field(...)
     port: int = Field(9007)
     model: str = Field("PGXL")
 
-class FlexConfig(BaseModel):
+class FlexConfig(_Frozen):
     host: str = Field(..., description="Flex radio IP/hostname")
     port: int = Field(4992, description="TCP CAT/SmartSDR port")
 
-class AppConfig(BaseModel):
+class AppConfig(_Frozen):
     vna: VNAConfig = Field(default_factory=VNAConfig)
     pgxl: PGXLConfig
     flex: Optional[FlexConfig] = None
-    bands_m: List[int] = Field(default_factory=lambda: [160,80,60,40,30,20,17,15,12,10,6])
+    bands_m: Tuple[int, ...] = Field(tuple(BAND_CENTERS_MHZ))
+
+# built once per process; reusing its validator is cheaper than AppConfig.model_validate
+_APP_CONFIG_ADAPTER = TypeAdapter(AppConfig)
+
+_CACHE_MAX = 100
+# (abspath, mtime_ns, size) -> validated config
+_cache: "OrderedDict[Tuple[str, int, int], AppConfig]" = OrderedDict()
 
 def load_config(path: str) -> AppConfig:
-    data = yaml.safe_load(pathlib.Path(path).read_text())
-    return AppConfig.model_validate(data)
+    p = pathlib.Path(path)
+    st = p.stat()
+    key = (os.path.abspath(p), st.st_mtime_ns, st.st_size)
+    cfg = _cache.get(key)
+    if cfg is not None:
+        _cache.move_to_end(key)
+        return cfg
+    # yaml is only needed on a cache miss
+    import yaml
+    data = yaml.load(p.read_text(), Loader=getattr(yaml, "CSafeLoader", yaml.SafeLoader))
+    cfg = _APP_CONFIG_ADAPTER.validate_python(data)
+    _cache[key] = cfg
+    if len(_cache) > _CACHE_MAX:
+        _cache.popitem(last=False)
+    return cfg
@@ -0,0 +1,252 @@
+from __future__ import annotations
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional, Union
+import os, socket, stat, subprocess, sys, tempfile, threading, time
+
+from .flex import FlexRadio
+from .pgxl import PGXL
+
+# Session daemon: one background process per device endpoint keeps the TCP
+# session (and its connect handshake) alive, and short-lived CLI processes talk
+# to it over an AF_UNIX socket instead of reconnecting. Sockets live in a
+# per-user 0700 directory, and clients only talk to sockets owned by their user.
+#
+# Wire format (one line each way):
+#   client -> daemon  "<0|1>|<command body>"   (1 = wait for the R<n>| reply)
+#                     "STOP"
+#   daemon -> client  "OK|<reply line or empty>"
+#                     "ERR|<exception name>|<message>"
+
+HAVE_AF_UNIX = hasattr(socket, "AF_UNIX") and hasattr(os, "getuid")
+IDLE_EXIT_S = 600.0
+_DEVICES = {"flex": FlexRadio, "pgxl": PGXL}
+
+def _runtime_dir() -> str:
+    """The per-user socket directory, created 0700; refused if anyone else owns or can open it."""
+    base = os.environ.get("XDG_RUNTIME_DIR") or tempfile.gettempdir()
+    path = os.path.join(base, f"pgxl-testkit-{os.getuid()}")
+    try:
+        os.mkdir(path, 0o700)
+    except FileExistsError:
+        pass
+    st = os.lstat(path)
+    if not stat.S_ISDIR(st.st_mode) or st.st_uid != os.getuid() or st.st_mode & 0o077:
+        raise RuntimeError(f"Refusing to use {path}: it is not a private directory owned by this user.")
+    return path
+
+def socket_path(kind: str, host: str, port: int) -> str:
+    return os.path.join(_runtime_dir(), f"{kind}-{host}-{port}.sock")
+
+def _owned_socket(path: str) -> bool:
+    try:
+        st = os.lstat(path)
+    except OSError:
+        return False
+    return stat.S_ISSOCK(st.st_mode) and st.st_uid == os.getuid()
+
+def _connect(path: str, timeout: float) -> socket.socket:
+    if not _owned_socket(path):
+        raise ConnectionRefusedError(f"{path} is not a session daemon socket owned by this user")
+    s = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    s.settimeout(timeout)
+    try:
+        s.connect(path)
+    except OSError:
+        s.close()
+        raise
+    return s
+
+def is_running(kind: str, host: str, port: int) -> bool:
+    if not HAVE_AF_UNIX:
+        return False
+    path = socket_path(kind, host, port)
+    if not _owned_socket(path):
+        return False
+    try:
+        _connect(path, 0.5).close()
+        return True
+    except OSError:
+        return False
+
+def start(kind: str, host: str, port: int, idle_exit: float = IDLE_EXIT_S, wait: float = 10.0) -> bool:
+    """Spawn a detached daemon for the endpoint; returns True once it is accepting clients."""
+    if not HAVE_AF_UNIX:
+        raise RuntimeError("Session daemon needs AF_UNIX sockets, which this platform lacks.")
+    if is_running(kind, host, port):
+        return True
+    subprocess.Popen(
+        [sys.executable, "-m", "pgxl_testkit.devices._broker", kind, host, str(port), str(idle_exit)],
+        stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+        start_new_session=True,
+    )
+    # the daemon is usually up within a few ms of its device handshake; start with
+    # short naps and back off so a slow device doesn't mean hundreds of probes
+    deadline = time.monotonic() + wait
+    nap = 0.002
+    while time.monotonic() < deadline:
+        if is_running(kind, host, port):
+            return True
+        time.sleep(min(nap, max(0.0, deadline - time.monotonic())))
+        nap = min(nap * 2, 0.1)
+    return False
+
+def stop(kind: str, host: str, port: int) -> bool:
+    """Ask a running daemon to exit; returns False if none was running."""
+    if not is_running(kind, host, port):
+        return False
+    with _connect(socket_path(kind, host, port), 5.0) as s:
+        s.sendall(b"STOP\n")
+        s.makefile("rb").readline()
+    return True
+
+# ---------- daemon side ----------
+def _serve_client(dev, conn: socket.socket, lock: threading.Lock, stop: threading.Event, path: str) -> None:
+    """Handle one client until EOF or STOP. Clients are served concurrently; their requests take turns on the device."""
+    try:
+        for raw in conn.makefile("rb"):
+            line = raw.decode("utf-8", errors="ignore").rstrip("\n")
+            if line == "STOP":
+                stop.set()
+                conn.sendall(b"OK|\n")
+                # wake the accept loop so the daemon exits before the client sees it still listening
+                try:
+                    _connect(path, 1.0).close()
+                except OSError:
+                    pass
+                return
+            expect, _, body = line.partition("|")
+            with lock:
+                try:
+                    if dev._sock is None:
+                        dev.connect()  # an earlier reconnect failed; try again
+                    reply = dev._send_counted(body, expect_response=(expect == "1"))
+                    out = f"OK|{reply or ''}\n"
+                except ConnectionError as e:
+                    # device dropped the session; reconnect so the next request gets a live one
+                    dev.disconnect()
+                    try:
+                        dev.connect()
+                    except Exception:
+                        dev.disconnect()  # leave it closed; the next request retries
+                    out = f"ERR|{type(e).__name__}|{e}\n"
+                except Exception as e:
+                    out = f"ERR|{type(e).__name__}|{e}\n"
+            conn.sendall(out.encode("utf-8"))
+    except OSError:
+        pass  # client went away mid-reply
+    finally:
+        conn.close()
+
+def serve(kind: str, host: str, port: int, idle_exit: float = IDLE_EXIT_S) -> None:
+    path = socket_path(kind, host, port)
+    dev = _DEVICES[kind](host, port)
+    dev.connect()
+    if os.path.exists(path):
+        os.unlink(path)
+    lock, stop = threading.Lock(), threading.Event()
+    clients: List[threading.Thread] = []
+    srv = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        srv.bind(path)
+        srv.listen()
+        # short accept timeout so the idle clock only runs while no client is attached
+        srv.settimeout(min(idle_exit, 1.0))
+        idle_since = time.monotonic()
+        while not stop.is_set():
+            try:
+                conn, _ = srv.accept()
+            except socket.timeout:
+                clients = [t for t in clients if t.is_alive()]
+                if clients:
+                    idle_since = time.monotonic()
+                elif time.monotonic() - idle_since >= idle_exit:
+                    break
+                continue
+            conn.settimeout(None)
+            t = threading.Thread(target=_serve_client, args=(dev, conn, lock, stop, path), daemon=True)
+            t.start()
+            clients.append(t)
+            idle_since = time.monotonic()
+    finally:
+        srv.close()
+        if os.path.exists(path):
+            os.unlink(path)
+        dev.disconnect()
+
+# ---------- client side ----------
+class _BrokerClient:
+    """Overrides the transport of a device class so its high-level methods go through the daemon."""
+    _kind: str = ""
+
+    def connect(self, timeout: float = 5.0, *args, **kwargs) -> None:
+        s = _connect(socket_path(self._kind, self.host, self.port), timeout)
+        s.settimeout(10.0)  # covers the daemon's own device timeout
+        self._sock = s
+        self._reader = s.makefile("rb")
+        self._connected = True
+
+    def disconnect(self) -> None:
+        if self._sock:
+            try:
+                self._reader.close()
+                self._sock.close()
+            finally:
+                self._sock = None
+        self._connected = False
+
+    @staticmethod
+    def _request(body: Union[str, bytes], expect_response: bool) -> bytes:
+        if isinstance(body, str):
+            body = body.encode("ascii")
+        return b"%s|%s\n" % (b"1" if expect_response else b"0", body)
+
+    def _read_reply(self) -> Optional[str]:
+        line = self._reader.readline().decode("utf-8", errors="ignore").rstrip("\n")
+        status, _, rest = line.partition("|")
+        if status == "OK":
+            return rest or None
+        name, _, msg = rest.partition("|")
+        if name == "TimeoutError":
+            raise TimeoutError(msg)
+        raise RuntimeError(f"{name}: {msg}" if name else f"{self._kind} session daemon closed the connection")
+
+    def _send_counted(self, body: Union[str, bytes], expect_response: bool = True, timeout: float = 1.5) -> Optional[str]:
+        if not self._sock:
+            raise RuntimeError(f"Not connected to the {self._kind} session daemon.")
+        self._sock.sendall(self._request(body, expect_response))
+        return self._read_reply()
+
+    def _send_batch(self, bodies: List[Union[str, bytes]], expect_response: bool = True, timeout: float = 1.5) -> Dict[int, str]:
+        # All requests go out in one write and the daemon answers them in order.
+        # Every reply is read, even after an error, so the stream stays in step.
+        # Keys are positions rather than radio sequence numbers.
+        if not self._sock:
+            raise RuntimeError(f"Not connected to the {self._kind} session daemon.")
+        self._sock.sendall(b"".join(self._request(body, expect_response) for body in bodies))
+        acks: Dict[int, str] = {}
+        error: Optional[Exception] = None
+        for i in range(len(bodies)):
+            try:
+                reply = self._read_reply()
+            except (TimeoutError, RuntimeError) as e:
+                error = error or e
+                continue
+            if reply is not None:
+                acks[i] = reply
+        if error is not None:
+            raise error
+        return acks
+
+    @contextmanager
+    def batched(self) -> Iterator["_BrokerClient"]:
+        # the daemon hop is local; pipelining happens (or not) on its side
+        yield self
+
+class FlexProxy(_BrokerClient, FlexRadio):
+    _kind = "flex"
+
+class PGXLProxy(_BrokerClient, PGXL):
+    _kind = "pgxl"
+
+if __name__ == "__main__":
+    serve(sys.argv[1], sys.argv[2], int(sys.argv[3]), float(sys.argv[4]) if len(sys.argv) > 4 else IDLE_EXIT_S)
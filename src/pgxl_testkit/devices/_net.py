@@ -0,0 +1,25 @@
+from __future__ import annotations
+import os, socket
+
+# Keepalive timing for long-held sessions (e.g. `flex batch --hold`) that sit
+# idle behind NAT: first probe after 30 s, then every 10 s, give up after 3.
+KEEPIDLE_S = 30
+KEEPINTVL_S = 10
+KEEPCNT = 3
+
+def tune_socket(sock: socket.socket) -> None:
+    """Disable Nagle for the line-at-a-time command protocol and turn on keepalive."""
+    sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)
+    # per-socket keepalive timers are Linux-only; elsewhere the OS defaults apply
+    for opt, val in (("TCP_KEEPIDLE", KEEPIDLE_S), ("TCP_KEEPINTVL", KEEPINTVL_S), ("TCP_KEEPCNT", KEEPCNT)):
+        if hasattr(socket, opt):
+            sock.setsockopt(socket.IPPROTO_TCP, getattr(socket, opt), val)
+    # opt-in busy polling (microseconds) for latency-critical benches; Linux-only
+    # and may need CAP_NET_ADMIN, so a refused request just falls back to interrupts
+    busy_poll = os.environ.get("PGXL_BUSY_POLL")
+    if busy_poll and hasattr(socket, "SO_BUSY_POLL"):
+        try:
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_BUSY_POLL, int(busy_poll))
+        except (OSError, ValueError):
+            pass
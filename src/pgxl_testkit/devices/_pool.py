@@ -0,0 +1,83 @@
+from __future__ import annotations
+from contextlib import contextmanager
+from functools import lru_cache
+from typing import Dict, Iterator, Tuple, Union
+import atexit, time
+
+from . import _broker
+from .flex import FlexRadio
+from .pgxl import PGXL
+
+IDLE_TIMEOUT_S = 60.0
+# Route through a running session daemon (see _broker) when there is one;
+# cleared by the CLI's --no-pool flag.
+USE_BROKER = True
+
+# (host, port) -> (live FlexRadio, last-used timestamp)
+_POOL: Dict[Tuple[str, int], Tuple[FlexRadio, float]] = {}
+
+@lru_cache(maxsize=16)
+def _radio(host: str, port: int) -> FlexRadio:
+    """One FlexRadio object per endpoint; sessions are reconnected on it."""
+    return FlexRadio(host, port)
+
+def get(host: str, port: int = 4992, idle_timeout: float = IDLE_TIMEOUT_S) -> FlexRadio:
+    """Return a connected FlexRadio for (host, port), reusing a live session when possible."""
+    key = (host, port)
+    entry = _POOL.pop(key, None)
+    if entry is not None:
+        r, last_used = entry
+        if r._connected and time.monotonic() - last_used <= idle_timeout:
+            return r
+        r.disconnect()
+    if USE_BROKER and _broker.is_running("flex", host, port):
+        r = _broker.FlexProxy(host, port)
+        r.connect()
+        return r
+    r = _radio(host, port)
+    if r._connected:
+        # the cached object is checked out by an outer acquire(); don't steal its socket
+        r = FlexRadio(host, port)
+    r.connect()
+    return r
+
+def release(r: FlexRadio) -> None:
+    """Hand a session back to the pool and refresh its idle timer."""
+    key = (r.host, r.port)
+    held = _POOL.get(key)
+    if held is not None and held[0] is not r:
+        # one idle session per endpoint; close the extra from a nested acquire()
+        r.disconnect()
+    elif r._connected:
+        _POOL[key] = (r, time.monotonic())
+
+def discard(r: FlexRadio) -> None:
+    """Close a session instead of returning it (e.g. after a socket error)."""
+    _POOL.pop((r.host, r.port), None)
+    r.disconnect()
+
+@contextmanager
+def acquire(host: str, port: int = 4992, idle_timeout: float = IDLE_TIMEOUT_S) -> Iterator[FlexRadio]:
+    r = get(host, port, idle_timeout)
+    try:
+        yield r
+    except (ConnectionError, OSError):
+        discard(r)
+        raise
+    except BaseException:
+        release(r)
+        raise
+    else:
+        release(r)
+
+def pgxl(host: str, port: int = 9008) -> Union[PGXL, _broker.PGXLProxy]:
+    """An unconnected PGXL for use as a context manager, via the session daemon if one is running."""
+    if USE_BROKER and _broker.is_running("pgxl", host, port):
+        return _broker.PGXLProxy(host, port)
+    return PGXL(host, port)
+
+@atexit.register
+def close_all() -> None:
+    while _POOL:
+        _, (r, _) = _POOL.popitem()
+        r.disconnect()
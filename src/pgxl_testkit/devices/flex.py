@@ -1,7 +1,19 @@
 ﻿from __future__ import annotations
-from dataclasses import dataclass
-from typing import Optional, List
-import socket, time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Dict, Iterator, Optional, List, Set, Union
+import re, selectors, socket, time
+
+from ..bands import BAND_CENTERS_MHZ
+from ._net import tune_socket
+
+# an R<n>| reply line, matched on raw bytes so other lines are never decoded;
+# group 1 is the sequence number
+_ACK_RE = re.compile(rb"^R(\d+)\|[^\r\n]*", re.M)
+
+# "slice t" bodies for every band center, MHz to 6 decimals as SmartSDR expects;
+# formatted once here so set_band/apply never format a float
+_TUNE_CMDS: Dict[int, bytes] = {b: b"slice t 0 %.6f" % mhz for b, mhz in BAND_CENTERS_MHZ.items()}
 
 @dataclass
 class FlexRadio:
@@ -9,115 +21,191 @@ class FlexRadio:
     port: int = 4992
     _sock: Optional[socket.socket] = None
     _seq: int = 0
-    _rxbuf: str = ""
+    _rxbuf: bytearray = field(default_factory=bytearray)
+    # fixed landing area for recv_into, allocated per session
+    _recvview: Optional[memoryview] = None
     _connected: bool = False
-
-    def connect(self, timeout: float = 5.0, prime_window: float = 0.6) -> None:
+    _batch: Optional[List[bytes]] = None
+    _sel: Optional[selectors.BaseSelector] = None
+    # sequences someone is waiting on, and the R<n>| lines that arrived for them
+    _awaiting: Set[int] = field(default_factory=set)
+    _acks: Dict[int, str] = field(default_factory=dict)
+
+    def connect(self, timeout: float = 5.0, prime_window: Optional[float] = None) -> None:
+        """Open the session. `prime_window` is accepted for compatibility and ignored."""
         self._sock = socket.create_connection((self.host, self.port), timeout=timeout)
-        self._sock.settimeout(0.1)
+        tune_socket(self._sock)
+        # reads only happen once the selector reports data, so the socket timeout
+        # just bounds sendall()
+        self._sel = selectors.DefaultSelector()
+        self._sel.register(self._sock, selectors.EVENT_READ)
         self._seq = 0
-        self._rxbuf = ""
+        self._rxbuf.clear()
+        self._recvview = memoryview(bytearray(65536))
+        self._awaiting.clear()
+        self._acks.clear()
         self._connected = True
-        self._prime_after_connect(prime_window)
-
-    def _prime_after_connect(self, prime_window: float) -> None:
-        if not self._sock:
-            return
-        deadline = time.time() + prime_window
-        while time.time() < deadline:
-            lines = self._read_lines()
-            if not lines:
-                time.sleep(0.02)
+        # The greeting (V/H lines) arrives before the ack to our first command,
+        # and _send_counted discards everything that isn't that ack.
+        self._send_counted(b"ping", timeout=1.0)
 
     def disconnect(self) -> None:
+        if self._sel:
+            self._sel.close()
+            self._sel = None
         if self._sock:
             try:
                 self._sock.close()
             finally:
                 self._sock = None
         self._connected = False
-        self._rxbuf = ""
+        self._rxbuf.clear()
+        self._recvview = None
+        self._awaiting.clear()
+        self._acks.clear()
+        self._batch = None
+
+    def __enter__(self) -> "FlexRadio":
+        self.connect()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.disconnect()
 
     def _next_seq(self) -> int:
         self._seq += 1
         return self._seq
 
-    def _read_lines(self) -> List[str]:
-        if not self._sock:
-            return []
+    def _read_acks(self, wait: float = 0.0) -> None:
+        """Consume complete lines received so far, blocking up to `wait` s for new data.
+
+        Acks for awaited sequences are filed in `_acks`; every other line (status and
+        subscription traffic) is dropped without being decoded.
+        """
+        if not (self._sock and self._sel and self._recvview):
+            return
         try:
-            chunk = self._sock.recv(4096)
-            if not chunk:
-                return []
-            self._rxbuf += chunk.decode("utf-8", errors="ignore")
-        except socket.timeout:
-            pass
+            n = self._sock.recv_into(self._recvview) if self._sel.select(wait) else None
         except Exception:
-            return []
-        lines: List[str] = []
-        while "\n" in self._rxbuf:
-            line, self._rxbuf = self._rxbuf.split("\n", 1)
-            lines.append(line.strip())
-        return lines
-
-    def _send_counted(self, body: str, expect_response: bool = True, timeout: float = 1.5) -> Optional[str]:
+            return
+        if n == 0:
+            # a closed socket stays readable; fail instead of spinning until the deadline
+            raise ConnectionError("FlexRadio closed the connection.")
+        if n:
+            self._rxbuf += self._recvview[:n]
+        # consume every complete line in one pass; the partial tail stays buffered
+        end = self._rxbuf.rfind(b"\n")
+        if end < 0:
+            return
+        for m in _ACK_RE.finditer(self._rxbuf, 0, end):
+            if (seq := int(m[1])) in self._awaiting:
+                self._acks[seq] = m[0].decode("utf-8", "ignore").strip()
+        del self._rxbuf[:end + 1]
+
+    def _send_counted(self, body: Union[str, bytes], expect_response: bool = True, timeout: float = 1.5) -> Optional[str]:
+        acks = self._send_batch([body], expect_response, timeout)
+        return next(iter(acks.values()), None)
+
+    def _send_batch(self, bodies: List[Union[str, bytes]], expect_response: bool = True, timeout: float = 1.5) -> Dict[int, str]:
+        """Send several commands in one write; if expect_response, wait for every R<n>| ack.
+
+        Returns the ack lines keyed by sequence number (empty when not waiting).
+        """
         if not (self._connected and self._sock):
             raise RuntimeError("FlexRadio is not connected.")
-        seq = self._next_seq()
-        wire = f"C{seq}|{body}\n"
-        self._sock.sendall(wire.encode("utf-8"))
+        seqs = [self._next_seq() for _ in bodies]
+        # SmartSDR commands are ASCII; bytes bodies go out as-is
+        wire = b"".join(b"C%d|%s\n" % (seq, body if isinstance(body, bytes) else body.encode("ascii"))
+                        for seq, body in zip(seqs, bodies))
+        if self._batch is not None:
+            self._batch.append(wire)
+            if not expect_response:
+                return {}
+            # a command we must wait on carries the queued ones in the same write
+            wire = b"".join(self._batch)
+            self._batch.clear()
         if not expect_response:
-            return None
-
-        want = f"R{seq}|"
-        deadline = time.time() + timeout
+            self._sock.sendall(wire)
+            return {}
 
-        for line in self._read_lines():
-            if line.startswith(want):
-                return line
+        self._awaiting.update(seqs)
+        try:
+            self._sock.sendall(wire)
+            deadline = time.monotonic() + timeout
+            self._read_acks()
+            while (missing := [s for s in seqs if s not in self._acks]) and (remaining := deadline - time.monotonic()) > 0:
+                self._read_acks(remaining)
+            if missing:
+                raise TimeoutError(f"No response for sequence {missing[0]} (body={bodies[seqs.index(missing[0])]!r})")
+            return {s: self._acks.pop(s) for s in seqs}
+        finally:
+            self._awaiting.difference_update(seqs)
+            for s in seqs:
+                self._acks.pop(s, None)
+
+    @contextmanager
+    def batched(self) -> Iterator["FlexRadio"]:
+        """Queue fire-and-forget commands and send them in as few writes as possible.
+
+        Queued commands go out with the next command that waits for a reply,
+        or when the block exits.
+        """
+        outer = self._batch is not None
+        if not outer:
+            self._batch = []
+        try:
+            yield self
+        finally:
+            if not outer:
+                pending, self._batch = self._batch, None
+                if pending and self._sock:
+                    self._sock.sendall(b"".join(pending))
 
-        while time.time() < deadline:
-            for line in self._read_lines():
-                if line.startswith(want):
-                    return line
-            time.sleep(0.01)
-        raise TimeoutError(f"No response for sequence {seq} (body='{body}')")
+    @staticmethod
+    def _mode_cmds(mode: str) -> List[Union[str, bytes]]:
+        return [f"slice s 0 mode={mode.strip().upper()}"]
 
     @staticmethod
-    def _mhz(f: float) -> str:
-        return f"{f:.6f}"
+    def _band_cmds(band_m: int) -> List[Union[str, bytes]]:
+        try:
+            tune = _TUNE_CMDS[band_m]
+        except KeyError:
+            raise ValueError(f"Unsupported band: {band_m} m") from None
+        return [b"slice s 0 tx=1", tune]
 
     @staticmethod
-    def _band_center_mhz(band_m: int) -> float:
-        centers = {
-            160: 1.900, 80: 3.750, 60: 5.358, 40: 7.150, 30: 10.125,
-            20: 14.175, 17: 18.118, 15: 21.225, 12: 24.940, 10: 28.850, 6: 50.500
-        }
-        if band_m not in centers:
-            raise ValueError(f"Unsupported band: {band_m} m")
-        return centers[band_m]
+    def _drive_cmds(watts: float) -> List[Union[str, bytes]]:
+        pct = int(max(0.0, min(100.0, watts)))
+        return [f"transmit set rfpower={pct}", f"transmit set tunepower={pct}"]
 
     def set_mode(self, mode: str) -> None:
-        m = mode.strip().upper()
-        self._send_counted(f"slice s 0 mode={m}")
+        self._send_batch(self._mode_cmds(mode))
 
     def set_band(self, band_m: int) -> None:
-        ctr = self._band_center_mhz(band_m)
-        self._send_counted("slice s 0 tx=1", expect_response=False)
-        self._send_counted(f"slice t 0 {self._mhz(ctr)}")
+        self._send_batch(self._band_cmds(band_m))
 
     def set_drive_w(self, watts: float) -> None:
-        pct = int(max(0.0, min(100.0, watts)))
-        self._send_counted(f"transmit set rfpower={pct}", expect_response=False)
-        self._send_counted(f"transmit set tunepower={pct}", expect_response=False)
+        self._send_batch(self._drive_cmds(watts), expect_response=False)
+
+    def apply(self, band_m: Optional[int] = None, mode: Optional[str] = None, drive_w: Optional[float] = None) -> None:
+        """Set any of band, mode and drive in one write, waiting once for all the acks."""
+        cmds: List[Union[str, bytes]] = []
+        if band_m is not None:
+            cmds += self._band_cmds(band_m)
+        if mode is not None:
+            cmds += self._mode_cmds(mode)
+        if drive_w is not None:
+            cmds += self._drive_cmds(drive_w)
+        if cmds:
+            self._send_batch(cmds)
 
     def key_carrier_on(self, wait_ack: bool = True) -> Optional[str]:
         """Enable TUNE carrier; returns R-line if wait_ack=True."""
-        return self._send_counted("transmit tune on", expect_response=wait_ack)
+        return self._send_counted(b"transmit tune on", expect_response=wait_ack)
 
     def key_carrier_off(self, wait_ack: bool = True) -> Optional[str]:
         """Disable TUNE carrier; returns R-line if wait_ack=True."""
-        return self._send_counted("transmit tune off", expect_response=wait_ack)
+        return self._send_counted(b"transmit tune off", expect_response=wait_ack)
 
     def set_two_tone(self, enabled: bool) -> None:
         val = "on" if enabled else "off"
@@ -1,7 +1,17 @@
 ﻿from __future__ import annotations
-from dataclasses import dataclass
-from typing import Optional, Dict, Any, Tuple, List
-import socket, time
+from dataclasses import dataclass, field
+from typing import Optional, Dict, Any, Tuple, List, Set, Union
+import re, selectors, socket, sys, time
+
+from ._net import tune_socket
+
+# an R<n>| reply line, matched on raw bytes so other lines are never decoded;
+# group 1 is the sequence number
+_ACK_RE = re.compile(rb"^R(\d+)\|[^\r\n]*", re.M)
+
+# Status keys read on every telemetry poll; interned so parsed dicts share the
+# key objects and telemetry() lookups hit on identity
+_KV_INTERN = frozenset(sys.intern(k) for k in ("state", "vdd", "id", "swr", "fwd", "hltemp", "temp", "fanmode"))
 
 @dataclass
 class PGXL:
@@ -9,105 +19,153 @@ class PGXL:
     port: int = 9008
     _sock: Optional[socket.socket] = None
     _seq: int = 0
-    _rxbuf: str = ""
+    _rxbuf: bytearray = field(default_factory=bytearray)
+    _recvview: Optional[memoryview] = None
+    _sel: Optional[selectors.BaseSelector] = None
+    # sequences someone is waiting on, and the R<n>| lines that arrived for them
+    _awaiting: Set[int] = field(default_factory=set)
+    _acks: Dict[int, str] = field(default_factory=dict)
     banner: Optional[str] = None
 
     # ---------- connection ----------
     def connect(self, timeout: float = 5.0) -> None:
         self._sock = socket.create_connection((self.host, self.port), timeout=timeout)
+        tune_socket(self._sock)
         self._sock.settimeout(0.5)
         self._seq = 0
-        self._rxbuf = ""
-        # Read initial banner/firmware line if present (non-fatal if absent)
+        self._rxbuf.clear()
+        self._recvview = memoryview(bytearray(65536))
+        self._awaiting.clear()
+        self._acks.clear()
+        # replies are read only once the selector reports data
+        self._sel = selectors.DefaultSelector()
+        self._sel.register(self._sock, selectors.EVENT_READ)
+        # Read initial banner/firmware line if present (non-fatal if absent).
+        # It lands in the same receive buffer as replies; anything after the
+        # first line stays queued for _read_acks.
+        self.banner = None
         try:
-            data = self._sock.recv(1024)
-            if data:
-                self.banner = data.decode(errors="replace").strip()
-        except Exception:
-            self.banner = None
+            n = self._sock.recv_into(self._recvview) if self._sel.select(0.5) else 0
+        except OSError:
+            n = 0
+        if n:
+            self._rxbuf += self._recvview[:n]
+            end = self._rxbuf.find(b"\n")
+            end = len(self._rxbuf) if end < 0 else end
+            self.banner = self._rxbuf[:end].decode(errors="replace").strip() or None
+            del self._rxbuf[:end + 1]
 
     def disconnect(self) -> None:
+        if self._sel:
+            self._sel.close()
+            self._sel = None
         if self._sock:
             try:
                 self._sock.close()
             finally:
                 self._sock = None
+        self._rxbuf.clear()
+        self._recvview = None
+        self._awaiting.clear()
+        self._acks.clear()
+
+    def __enter__(self) -> "PGXL":
+        self.connect()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.disconnect()
 
     # ---------- low-level counted I/O ----------
     def _next_seq(self) -> int:
         self._seq += 1
         return self._seq
 
-    def _read_lines(self) -> List[str]:
-        if not self._sock:
-            return []
+    def _read_acks(self, wait: float = 0.0) -> None:
+        """Consume complete lines received so far, blocking up to `wait` s for new data.
+
+        Replies for awaited sequences are filed in `_acks`; every other line (status and
+        subscription traffic) is dropped without being decoded.
+        """
+        if not (self._sock and self._sel and self._recvview):
+            return
         try:
-            chunk = self._sock.recv(4096)
-            if not chunk:
-                return []
-            self._rxbuf += chunk.decode("utf-8", errors="ignore")
-        except socket.timeout:
-            pass
+            n = self._sock.recv_into(self._recvview) if self._sel.select(wait) else None
         except Exception:
-            return []
-        lines: List[str] = []
-        while "\n" in self._rxbuf:
-            line, self._rxbuf = self._rxbuf.split("\n", 1)
-            lines.append(line.strip())
-        return lines
-
-    def _send_counted(self, body: str, expect_response: bool = True, timeout: float = 1.5) -> Optional[str]:
+            return
+        if n == 0:
+            # a closed socket stays readable; fail instead of spinning until the deadline
+            raise ConnectionError("PGXL closed the connection.")
+        if n:
+            self._rxbuf += self._recvview[:n]
+        # consume every complete line in one pass; the partial tail stays buffered
+        end = self._rxbuf.rfind(b"\n")
+        if end < 0:
+            return
+        for m in _ACK_RE.finditer(self._rxbuf, 0, end):
+            if (seq := int(m[1])) in self._awaiting:
+                self._acks[seq] = m[0].decode("utf-8", "ignore").strip()
+        del self._rxbuf[:end + 1]
+
+    def _send_counted(self, body: Union[str, bytes], expect_response: bool = True, timeout: float = 1.5) -> Optional[str]:
         """
         TX: C<n>|{body}\n
         Wait for matching: R<n>|...
         """
+        acks = self._send_batch([body], expect_response, timeout)
+        return next(iter(acks.values()), None)
+
+    def _send_batch(self, bodies: List[Union[str, bytes]], expect_response: bool = True, timeout: float = 1.5) -> Dict[int, str]:
+        """Send several commands in one write; if expect_response, reap every R<n>| reply.
+
+        Replies are matched by sequence number as they arrive, so K commands cost
+        about one round-trip. Returns the reply lines keyed by sequence number.
+        """
         if not self._sock:
             raise RuntimeError("Not connected to PGXL.")
-        seq = self._next_seq()
-        wire = f"C{seq}|{body}\n"
-        self._sock.sendall(wire.encode("utf-8"))
+        seqs = [self._next_seq() for _ in bodies]
+        wire = b"".join(b"C%d|%s\n" % (seq, body if isinstance(body, bytes) else body.encode("ascii"))
+                        for seq, body in zip(seqs, bodies))
         if not expect_response:
-            return None
+            self._sock.sendall(wire)
+            return {}
 
-        wanted = f"R{seq}|"
-        deadline = time.time() + timeout
-
-        # check buffered first
-        for line in self._read_lines():
-            if line.startswith(wanted):
-                return line
-
-        # poll until timeout
-        while time.time() < deadline:
-            for line in self._read_lines():
-                if line.startswith(wanted):
-                    return line
-            time.sleep(0.01)
-
-        raise TimeoutError(f"No response for sequence {seq} (body='{body}')")
+        self._awaiting.update(seqs)
+        try:
+            self._sock.sendall(wire)
+            # check buffered first, then block in select() until data or the deadline
+            deadline = time.monotonic() + timeout
+            self._read_acks()
+            while (missing := [s for s in seqs if s not in self._acks]) and (remaining := deadline - time.monotonic()) > 0:
+                self._read_acks(remaining)
+            if missing:
+                raise TimeoutError(f"No response for sequence {missing[0]} (body={bodies[seqs.index(missing[0])]!r})")
+            return {s: self._acks.pop(s) for s in seqs}
+        finally:
+            self._awaiting.difference_update(seqs)
+            for s in seqs:
+                self._acks.pop(s, None)
 
     @staticmethod
     def _parse_kv(reply: str) -> Tuple[str, Dict[str, str]]:
         # R<n>|<status>|k=v k=v ...
-        parts = reply.split("|", 2)
-        if len(parts) < 3:
+        _, sep1, rest = reply.partition("|")
+        status, sep2, kv_blob = rest.partition("|")
+        if not (sep1 and sep2):
             raise ValueError(f"Unexpected response format: {reply!r}")
-        status = parts[1]
-        kv_blob = parts[2].strip()
         kv: Dict[str, str] = {}
-        if kv_blob:
-            for item in kv_blob.split():
-                if "=" in item:
-                    k, v = item.split("=", 1)
-                    kv[k] = v
+        for item in kv_blob.split():
+            k, sep, v = item.partition("=")
+            if sep:
+                kv[sys.intern(k) if k in _KV_INTERN else k] = v
         return status, kv
 
     # ---------- high-level controls ----------
     def standby(self) -> None:
-        self._send_counted("operate=0", expect_response=False)
+        self._send_counted(b"operate=0", expect_response=False)
 
     def operate(self) -> None:
-        self._send_counted("operate=1", expect_response=False)
+        self._send_counted(b"operate=1", expect_response=False)
 
     def set_mode(self, mode: str) -> None:
         # mode: 'AB' or 'AAB'
@@ -121,7 +179,7 @@ class PGXL:
         self._send_counted(f"setup bandA={b}")
 
     def telemetry(self) -> Dict[str, Any]:
-        reply = self._send_counted("status")
+        reply = self._send_counted(b"status")
         _, kv = self._parse_kv(reply)
 
         def fget(k: str) -> Optional[float]:
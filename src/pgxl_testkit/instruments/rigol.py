@@ -1,11 +1,35 @@
 
+from functools import lru_cache
 from typing import Tuple, List
-import os, math
+import os
+import numpy as np
 try:
     import pyvisa
 except Exception:
     pyvisa = None
 
+# Sweep axes and simulated traces depend only on (start, stop, points), so they
+# are built once per shape and shared between instances; the arrays are read-only.
+@lru_cache(maxsize=64)
+def _freq_axis(start_hz: float, stop_hz: float, points: int) -> np.ndarray:
+    # a one-point (CW) sweep sits mid-span, as on the instrument
+    if points > 1:
+        freqs = np.linspace(start_hz, stop_hz, points)
+    else:
+        freqs = np.array([(start_hz + stop_hz) / 2.0])
+    freqs.flags.writeable = False
+    return freqs
+
+@lru_cache(maxsize=64)
+def _sim_s21(start_hz: float, stop_hz: float, points: int) -> np.ndarray:
+    freqs = _freq_axis(start_hz, stop_hz, points)
+    knee = 65e6
+    # clip the log argument below the knee, where np.where discards it anyway
+    rolloff = -35.0 - 20.0*np.log10(np.maximum(freqs - knee + 1, 1.0)/1e6)
+    s21 = np.where(freqs <= knee, 0.2, rolloff)
+    s21.flags.writeable = False
+    return s21
+
 class RigolVNA:
     def __init__(self, resource: str|None=None, timeout_ms: int = 5000):
         self.resource = resource
@@ -25,21 +49,18 @@ class RigolVNA:
         if self.rm: self.rm.close()
 
     def sweep_s11(self, start_hz: float, stop_hz: float, points: int = 201) -> Tuple[List[float], List[float]]:
-        freqs = [start_hz + i*(stop_hz-start_hz)/(points-1) for i in range(points)]
+        freqs = _freq_axis(start_hz, stop_hz, points)
         if self.sim:
-            s11 = [-18.0 for _ in freqs]
-            return freqs, s11
+            return freqs.tolist(), [-18.0] * freqs.size
         # TODO: SCPI for S11
-        return freqs, [-18.0 for _ in freqs]
+        return freqs.tolist(), [-18.0] * freqs.size
 
     def sweep_s21(self, start_hz: float, stop_hz: float, points: int = 201) -> Tuple[List[float], List[float]]:
-        freqs = [start_hz + i*(stop_hz-start_hz)/(points-1) for i in range(points)]
+        freqs = _freq_axis(start_hz, stop_hz, points)
         if self.sim:
-            knee = 65e6
-            s21 = [0.2 if f <= knee else -35.0 - 20.0*math.log10((f-knee+1)/1e6) for f in freqs]
-            return freqs, s21
+            return freqs.tolist(), _sim_s21(start_hz, stop_hz, points).tolist()
         # TODO: SCPI for S21
-        return freqs, [0.0 for _ in freqs]
+        return freqs.tolist(), np.zeros(freqs.size).tolist()
 
     def sa_config(self, center_hz: float, span_hz: float, rbw_hz: float, vbw_hz: float|None=None) -> None:
         if self.sim: return
@@ -1,11 +1,20 @@
 
+from functools import lru_cache
 from typing import Tuple, List
-import os, math
+import os
+import numpy as np
 try:
     import pyvisa
 except Exception:
     pyvisa = None
 
+# repeated sweeps over the same span share one read-only frequency grid
+@lru_cache(maxsize=16)
+def _freq_axis(start_hz: float, stop_hz: float, points: int) -> np.ndarray:
+    freqs = np.linspace(start_hz, stop_hz, points)
+    freqs.flags.writeable = False
+    return freqs
+
 class SiglentSVA:
     def __init__(self, resource: str|None=None, timeout_ms: int = 5000):
         self.resource = resource
@@ -25,24 +34,24 @@ class SiglentSVA:
         if self.rm: self.rm.close()
 
     def sweep_s11(self, start_hz: float, stop_hz: float, points: int = 201) -> Tuple[List[float], List[float]]:
-        freqs = [start_hz + i*(stop_hz-start_hz)/(points-1) for i in range(points)]
+        freqs = _freq_axis(start_hz, stop_hz, points)
         if self.sim:
-            s11 = [-20.0 + 1.5*math.sin(2*math.pi*(f-1e6)/40e6) for f in freqs]
-            return freqs, s11
+            s11 = -20.0 + 1.5*np.sin(2*np.pi*(freqs-1e6)/40e6)
+            return freqs.tolist(), s11.tolist()
         # TODO: real SCPI for S11 (SNA) measurement
         # Placeholder: return simulated
-        s11 = [-20.0 for _ in freqs]
-        return freqs, s11
+        return freqs.tolist(), [-20.0] * freqs.size
 
     def sweep_s21(self, start_hz: float, stop_hz: float, points: int = 201) -> Tuple[List[float], List[float]]:
-        freqs = [start_hz + i*(stop_hz-start_hz)/(points-1) for i in range(points)]
+        freqs = _freq_axis(start_hz, stop_hz, points)
         if self.sim:
             knee = 60e6
-            s21 = [0.1 if f <= knee else -40.0 - 20.0*math.log10((f-knee+1)/1e6) for f in freqs]
-            return freqs, s21
+            # clip the log argument below the knee, where np.where discards it anyway
+            rolloff = -40.0 - 20.0*np.log10(np.maximum(freqs - knee + 1, 1.0)/1e6)
+            s21 = np.where(freqs <= knee, 0.1, rolloff)
+            return freqs.tolist(), s21.tolist()
         # TODO: real SCPI to configure 2-port S21 and fetch trace
-        s21 = [0.0 for _ in freqs]
-        return freqs, s21
+        return freqs.tolist(), [0.0] * freqs.size
 
     # Spectrum helpers
     def sa_config(self, center_hz: float, span_hz: float, rbw_hz: float, vbw_hz: float|None=None) -> None:
@@ -50,13 +59,22 @@ class SiglentSVA:
         # TODO: set SA mode, center/span/RBW/VBW
         pass
 
+    MAX_MARKERS = 4
+
     def sa_marker_read(self, freqs: List[float]) -> List[float]:
         if self.sim:
             # Simulate tones at fc±700 Hz: center at 14.2 MHz
-            vals = [-10.0 for _ in freqs]
-            return vals
-        # TODO: place markers and read dBm values
-        return [float('nan') for _ in freqs]
+            return [-10.0] * len(freqs)
+        # Place a group of markers and read them back in one chained query
+        # (one VISA round-trip per group instead of two per marker)
+        vals: List[float] = []
+        for i in range(0, len(freqs), self.MAX_MARKERS):
+            group = freqs[i:i + self.MAX_MARKERS]
+            place = ";".join(f":CALC:MARK{n}:STAT ON;:CALC:MARK{n}:X {f:.0f}" for n, f in enumerate(group, 1))
+            read = ";".join(f":CALC:MARK{n}:Y?" for n in range(1, len(group) + 1))
+            reply = self.inst.query(f"{place};{read}")
+            vals.extend(float(v) for v in reply.strip().split(";"))
+        return vals
 
     def screenshot(self, path: str) -> None:
         if self.sim:
@@ -1,5 +1,7 @@
 
-from typing import Protocol, Tuple, List
+from typing import TYPE_CHECKING, Protocol, Tuple, List
+if TYPE_CHECKING:
+    from ..config import AppConfig
 
 class VNA(Protocol):
     def connect(self) -> None: ...
@@ -10,3 +12,13 @@ class VNA(Protocol):
     def sa_config(self, center_hz: float, span_hz: float, rbw_hz: float, vbw_hz: float|None=None) -> None: ...
     def sa_marker_read(self, freqs: List[float]) -> List[float]: ...
     def screenshot(self, path: str) -> None: ...
+
+def connect_vna(cfg: "AppConfig") -> VNA:
+    """Open the analyzer named by cfg.vna.vendor ('siglent', anything else means Rigol)."""
+    if cfg.vna.vendor.lower() == "siglent":
+        from .siglent import SiglentSVA as cls
+    else:
+        from .rigol import RigolVNA as cls
+    vna = cls(cfg.vna.visa.resource, cfg.vna.visa.timeout_ms)
+    vna.connect()
+    return vna
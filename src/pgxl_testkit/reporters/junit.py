@@ -1,16 +1,25 @@
 
 from ..runners.runner import SuiteResult
-import xml.etree.ElementTree as ET
+from xml.sax.saxutils import XMLGenerator
 class JUnitReporter:
     def __init__(self, path: str): self.path = path
     def emit(self, result: SuiteResult) -> None:
-        testsuite = ET.Element("testsuite", name=result.suite, tests=str(len(result.cases)),
-                               failures=str(result.failed), skipped=str(result.skipped))
-        for c in result.cases:
-            tc = ET.SubElement(testsuite, "testcase", name=c.id)
-            if c.failed:
-                failure = ET.SubElement(tc, "failure", message="failed")
-                failure.text = "\n".join(c.logs)
-            if c.skipped:
-                ET.SubElement(tc, "skipped")
-        ET.ElementTree(testsuite).write(self.path, encoding="utf-8", xml_declaration=True)
+        # streamed straight to the file: no element tree, and logs are escaped
+        # line by line instead of being joined into one string first
+        with open(self.path, "wb") as f:
+            g = XMLGenerator(f, "utf-8", short_empty_elements=True)
+            g.startDocument()
+            g.startElement("testsuite", {"name": result.suite, "tests": str(len(result.cases)),
+                                         "failures": str(result.failed), "skipped": str(result.skipped)})
+            for c in result.cases:
+                g.startElement("testcase", {"name": c.id})
+                if c.failed:
+                    g.startElement("failure", {"message": "failed"})
+                    for i, line in enumerate(c.logs):
+                        g.characters(f"\n{line}" if i else line)
+                    g.endElement("failure")
+                if c.skipped:
+                    g.startElement("skipped", {}); g.endElement("skipped")
+                g.endElement("testcase")
+            g.endElement("testsuite")
+            g.endDocument()
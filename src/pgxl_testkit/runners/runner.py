@@ -1,17 +1,23 @@
 
-from dataclasses import dataclass, field
-from typing import List, Callable, Dict, Any
-import importlib
+from collections import deque
+from dataclasses import dataclass, field, asdict
+from typing import Deque, List, Callable, Dict, Any, Optional
+import atexit, importlib, json, pathlib, threading
+from functools import lru_cache
 from ..config import AppConfig
 from ..logging import setup_logging
 
+# newest log lines kept per case; older ones are dropped so a case that logs
+# per sample can't grow memory or report size without bound
+LOG_MAXLEN = 10_000
+
 @dataclass
 class TestCaseResult:
     id: str
     passed: int = 0
     failed: int = 0
     skipped: int = 0
-    logs: List[str] = field(default_factory=list)
+    logs: Deque[str] = field(default_factory=lambda: deque(maxlen=LOG_MAXLEN))
     metrics: Dict[str, Any] = field(default_factory=dict)
     artifacts: List[str] = field(default_factory=list)
 
@@ -26,34 +32,105 @@ class SuiteResult:
     @property
     def skipped(self) -> int: return sum(c.skipped for c in self.cases)
 
+class InstrumentRegistry:
+    """Connected devices shared by every suite run in this process, keyed by (class, args).
+
+    The first get() constructs and connects; later calls return the same live
+    instance, so a menu session or `all` run connects to each device once.
+    Instances are not thread-safe; only one test case may use them at a time.
+    """
+    def __init__(self):
+        self._cache: Dict[tuple, Any] = {}
+        self._locks: Dict[tuple, threading.Lock] = {}
+        self._lock = threading.Lock()
+
+    def get(self, cls, *args):
+        key = (cls, args)
+        with self._lock:
+            key_lock = self._locks.setdefault(key, threading.Lock())
+        # per-key lock: different devices still connect concurrently
+        with key_lock:
+            inst = self._cache.get(key)
+            if inst is None or inst._sock is None:
+                inst = cls(*args)
+                inst.connect()
+                self._cache[key] = inst
+        return inst
+
+    def close_all(self) -> None:
+        with self._lock:
+            items, self._cache = list(self._cache.values()), {}
+        for inst in items:
+            try:
+                inst.disconnect()
+            except Exception:
+                pass
+
+instruments = InstrumentRegistry()
+atexit.register(instruments.close_all)
+
 class TestRunner:
     def __init__(self, cfg: AppConfig, out_dir: str = "artifacts"):
         self.cfg = cfg
         self.out_dir = out_dir
         self.log = setup_logging()
+        # suite -> discovered cases; TestCase objects only wrap a function, so
+        # `all` and discover-then-run reuse them
+        self._cases: Dict[str, List[TestCase]] = {}
 
-    def _load_suite_module(self, suite: str):
+    @staticmethod
+    @lru_cache(maxsize=None)
+    def _load_suite_module(suite: str):
         return importlib.import_module(f"pgxl_testkit.testsuites.{suite}")
 
     def discover(self, suite: str) -> List["TestCase"]:
-        mod = self._load_suite_module(suite)
-        return getattr(mod, "discover")()
+        cases = self._cases.get(suite)
+        if cases is None:
+            cases = self._cases[suite] = getattr(self._load_suite_module(suite), "discover")()
+        return cases
 
     def run(self, suite: str) -> SuiteResult:
-        mod = self._load_suite_module(suite)
-        test_cases: List[TestCase] = getattr(mod, "discover")()
-        results: List[TestCaseResult] = []
-        for tc in test_cases:
-            res = TestCaseResult(id=tc.id)
-            try:
-                tc.run(self.cfg, res)
-                if res.failed == 0 and res.skipped == 0:
-                    res.passed = 1
-            except Exception as e:
-                res.failed = 1
-                res.logs.append(f"Error: {e!r}")
-            results.append(res)
-        return SuiteResult(suite=suite, cases=results)
+        test_cases = self.discover(suite)
+        results = [_run_one(tc, self.cfg) for tc in test_cases]
+        result = SuiteResult(suite=suite, cases=results)
+        self._save_last_result(result)
+        return result
+
+    def _last_result_path(self, suite: str) -> pathlib.Path:
+        return pathlib.Path(self.out_dir) / suite / "last.json"
+
+    def _save_last_result(self, result: SuiteResult) -> None:
+        path = self._last_result_path(result.suite)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # asdict() would deep-copy the deque as-is; JSON wants a list
+        data = {"suite": result.suite, "cases": [{**asdict(c), "logs": list(c.logs)} for c in result.cases]}
+        path.write_text(json.dumps(data, default=str))
+
+    def load_last_result(self, suite: str) -> Optional[SuiteResult]:
+        """Return the result persisted by the last run() of this suite, or None."""
+        path = self._last_result_path(suite)
+        if not path.exists():
+            return None
+        data = json.loads(path.read_text())
+        return SuiteResult(suite=data["suite"], cases=[
+            TestCaseResult(**{**c, "logs": deque(c["logs"], maxlen=LOG_MAXLEN)}) for c in data["cases"]])
+
+def _run_one(tc: "TestCase", cfg: AppConfig) -> TestCaseResult:
+    res = TestCaseResult(id=tc.id)
+    try:
+        tc.run(cfg, res)
+        if res.failed == 0 and res.skipped == 0:
+            res.passed = 1
+    except OSError as e:  # includes ConnectionError and TimeoutError
+        res.failed = 1
+        res.logs.append(f"Error: {e!r}")
+        # a dropped or wedged link may leave a cached instance that still looks
+        # connected; disconnect them all so the next case reconnects fresh
+        instruments.close_all()
+    except Exception as e:
+        res.failed = 1
+        res.logs.append(f"Error: {e!r}")
+    return res
 
 class TestCase:
     def __init__(self, id: str, func: Callable[[AppConfig, TestCaseResult], None]):
@@ -1,45 +1,72 @@
 
-import time, csv
-from ..runners.runner import TestCase, TestCaseResult
+import time, csv, os
+from ..runners.runner import TestCase, TestCaseResult, instruments
 from ..config import AppConfig
 from ..devices.pgxl import PGXL
 from ..devices.flex import FlexRadio
 from ..utils.artifacts import new_run_dir, write_context
-from ..utils.plots import line_plot
+
+# telemetry rows are written in batches: at most this many rows or seconds
+# of data are lost if the run dies mid-way
+FLUSH_ROWS = 64
+FLUSH_S = 30.0
+
+def _flush_rows(f, w, batch: list) -> None:
+    w.writerows(batch); batch.clear()
+    f.flush(); os.fsync(f.fileno())
 
 def burn_in_2h(cfg: AppConfig, res: TestCaseResult) -> None:
+    # numpy/matplotlib load when the suite runs, not when it is only discovered
+    import numpy as np
+    from ..utils.plots import line_plot
     outdir = new_run_dir("burn_in")
-    pg = PGXL(cfg.pgxl.host, cfg.pgxl.port, cfg.pgxl.model); pg.connect()
-    fx = None
-    if cfg.flex: fx = FlexRadio(cfg.flex.host, cfg.flex.port); fx.connect()
+    pg = instruments.get(PGXL, cfg.pgxl.host, cfg.pgxl.port)
+    fx = instruments.get(FlexRadio, cfg.flex.host, cfg.flex.port) if cfg.flex else None
 
     # Setup (stub): operate, key carrier
     pg.operate()
     if fx:
-        fx.set_mode("CW"); fx.set_drive_w(10.0); fx.key_carrier_on()
+        fx.apply(mode="CW", drive_w=10.0); fx.key_carrier_on()
 
-    t0 = time.time()
+    csv_path = outdir / "telemetry.csv"
     duration_s = 2*60*60  # 2 hours
     interval_s = 5
-    rows = []
+    n_rows = 0
     try:
-        while time.time() - t0 < duration_s:
-            tel = pg.telemetry()
-            t = int(time.time() - t0)
-            rows.append([t, tel.get("PA_TempC"), tel.get("PS_TempC"), tel.get("Vd"), tel.get("Id"), tel.get("SWR"), tel.get("PoutW")])
-            time.sleep(interval_s)
+        with csv_path.open("w", newline="") as f:
+            w = csv.writer(f); w.writerow(["t_sec","pa_temp_c","ps_temp_c","vd_v","id_a","swr","pout_w"])
+            batch = []
+            t0 = last_flush = time.monotonic()
+            try:
+                # samples sit on the t0 + k*interval_s grid, so telemetry latency can't
+                # drift it; a read slower than the interval skips the slots it overran
+                # rather than bursting to catch up, and t_sec is when the read started
+                k, n_slots = 0, duration_s // interval_s
+                while k < n_slots:
+                    t_sec = round(time.monotonic() - t0, 3)
+                    tel = pg.telemetry()
+                    batch.append([t_sec, tel.get("PA_TempC"), tel.get("PS_TempC"), tel.get("Vd"), tel.get("Id"), tel.get("SWR"), tel.get("PoutW")])
+                    n_rows += 1
+                    now = time.monotonic()
+                    if len(batch) >= FLUSH_ROWS or now - last_flush >= FLUSH_S:
+                        _flush_rows(f, w, batch); last_flush = now
+                    k = max(k + 1, int((now - t0) // interval_s) + 1)
+                    slack = t0 + k*interval_s - time.monotonic()
+                    if slack > 0: time.sleep(slack)
+            finally:
+                _flush_rows(f, w, batch)
     finally:
         if fx: fx.key_carrier_off()
 
-    with (outdir / "telemetry.csv").open("w", newline="") as f:
-        w = csv.writer(f); w.writerow(["t_sec","pa_temp_c","ps_temp_c","vd_v","id_a","swr","pout_w"]); w.writerows(rows)
-
     # Plots
-    if rows:
-        t = [r[0] for r in rows]
-        line_plot(t, [r[1] for r in rows], "PA Temp vs Time", "t (s)", "Temp (C)", (outdir/"pa_temp.png").as_posix())
-        line_plot(t, [r[3] for r in rows], "Drain Voltage vs Time", "t (s)", "Vd (V)", (outdir/"vd.png").as_posix())
-        line_plot(t, [r[4] for r in rows], "Drain Current vs Time", "t (s)", "Id (A)", (outdir/"id.png").as_posix())
+    if n_rows:
+        # read the table back rather than keeping every row in memory; empty
+        # (missing) readings load as nan, and each series is a strided column view
+        data = np.atleast_2d(np.genfromtxt(csv_path, delimiter=",", skip_header=1))
+        t = data[:, 0]
+        line_plot(t, data[:, 1], "PA Temp vs Time", "t (s)", "Temp (C)", (outdir/"pa_temp.png").as_posix())
+        line_plot(t, data[:, 3], "Drain Voltage vs Time", "t (s)", "Vd (V)", (outdir/"vd.png").as_posix())
+        line_plot(t, data[:, 4], "Drain Current vs Time", "t (s)", "Id (A)", (outdir/"id.png").as_posix())
     write_context(outdir, {"suite":"burn_in","interval_s":interval_s,"duration_s":duration_s})
     res.logs.append("Burn-in completed (stub data if simulation).")
 
@@ -0,0 +1,49 @@
+
+import csv
+from ..runners.runner import TestCase, TestCaseResult, instruments
+from ..config import AppConfig
+from ..devices.pgxl import PGXL
+from ..devices.flex import FlexRadio
+from ..utils.artifacts import new_run_dir, write_context
+
+# Both quantities come from the same telemetry read, so one band/mode pass
+# records them both: (telemetry key, CSV name, CSV column, chart title, y label, PNG prefix)
+_OUTPUTS = (
+    ("Id", "drain_current", "id_a", "Drain Current", "Id (A)", "id"),
+    ("Vd", "drain_voltage", "vd_v", "Drain Voltage", "Vd (V)", "vd"),
+)
+
+def drain_sweep(cfg: AppConfig, res: TestCaseResult, suite: str = "drain") -> None:
+    """One pass over bands and bias modes; both artifact sets go into one run
+    directory under `suite`, the name the HTML report looks under."""
+    from ..utils.plots import bar_plot
+    outdir = new_run_dir(suite)
+    pg = instruments.get(PGXL, cfg.pgxl.host, cfg.pgxl.port)
+    fx = instruments.get(FlexRadio, cfg.flex.host, cfg.flex.port) if cfg.flex else None
+
+    modes = ["AB","AAB"]
+    rows = {key: [] for key, *_ in _OUTPUTS}
+    # per-mode values in cfg.bands_m order, filled alongside rows for the charts
+    by_mode = {key: {m: [] for m in modes} for key, *_ in _OUTPUTS}
+    for b in cfg.bands_m:
+        if fx: fx.apply(band_m=b, mode="CW", drive_w=10.0)
+        for m in modes:
+            pg.set_mode(m)
+            tel = pg.telemetry()
+            for key, *_ in _OUTPUTS:
+                val = tel.get(key, 0.0)
+                rows[key].append([b, m, val])
+                by_mode[key][m].append(val)
+
+    labels = [str(b) for b in cfg.bands_m]
+    for key, name, column, title, ylabel, prefix in _OUTPUTS:
+        with (outdir / f"{name}.csv").open("w", newline="") as f:
+            w = csv.writer(f); w.writerow(["band_m","mode",column]); w.writerows(rows[key])
+        # Chart per mode
+        for m in modes:
+            bar_plot(labels, by_mode[key][m], f"{title} {m}", "Band (m)", ylabel, (outdir / f"{prefix}_{m}.png").as_posix())
+    write_context(outdir, {"suite":suite,"modes":modes})
+    res.logs.append("Drain current and voltage recorded (simulation if no live PGXL).")
+
+def discover():
+    return [ TestCase("drain.sweep", drain_sweep) ]
@@ -1,40 +1,44 @@
 
 import csv
-from ..runners.runner import TestCase, TestCaseResult
+from ..runners.runner import TestCase, TestCaseResult, instruments
 from ..config import AppConfig
 from ..devices.pgxl import PGXL
 from ..devices.flex import FlexRadio
 from ..utils.artifacts import new_run_dir, write_context
-from ..utils.plots import bar_plot
 
 def gain_sweep(cfg: AppConfig, res: TestCaseResult) -> None:
+    import numpy as np
+    from ..utils.plots import bar_plot
     outdir = new_run_dir("gain_band")
-    pg = PGXL(cfg.pgxl.host, cfg.pgxl.port, cfg.pgxl.model); pg.connect()
-    fx = FlexRadio(cfg.flex.host, cfg.flex.port) if cfg.flex else None
-    if fx: fx.connect()
+    pg = instruments.get(PGXL, cfg.pgxl.host, cfg.pgxl.port)
+    fx = instruments.get(FlexRadio, cfg.flex.host, cfg.flex.port) if cfg.flex else None
 
     drive_levels = [5.0, 10.0, 20.0]  # W
-    rows = []
+    pouts = []
     for b in cfg.bands_m:
-        if fx: fx.set_band(b); fx.set_mode("CW")
+        if fx: fx.apply(band_m=b, mode="CW")
         for d in drive_levels:
             if fx: fx.set_drive_w(d)
-            tel = pg.telemetry()
-            pout = tel.get("PoutW", 0.0)
-            # Gain in dB: 10*log10(Pout/Pin)
-            import math
-            gdb = 10*math.log10(max(pout,1e-3)/max(d,1e-3))
-            rows.append([b, d, pout, gdb])
+            pouts.append(pg.telemetry().get("PoutW", 0.0))
+
+    # Gain in dB: 10*log10(Pout/Pin), one row per band, one column per drive level
+    # (a missing Pout reading comes through as nan)
+    pout = np.array(pouts, dtype=float).reshape(-1, len(drive_levels))
+    gain = 10*np.log10(np.maximum(pout, 1e-3)/np.maximum(drive_levels, 1e-3))
+    rows = [[b, d, p, g]
+            for b, p_row, g_row in zip(cfg.bands_m, pout.tolist(), gain.tolist())
+            for d, p, g in zip(drive_levels, p_row, g_row)]
+    # gains at the 10 W drive level per band, for the chart
+    gain_10w = {}
+    for b, g in zip(cfg.bands_m, gain[:, drive_levels.index(10.0)].tolist()):
+        gain_10w.setdefault(b, []).append(g)
 
     with (outdir / "gain.csv").open("w", newline="") as f:
         w = csv.writer(f); w.writerow(["band_m","drive_w","pout_w","gain_db"]); w.writerows(rows)
 
     # Simple chart: average gain per band at 10 W
-    bands = sorted(set(r[0] for r in rows))
-    avg_gain = []
-    for b in bands:
-        g = [r[3] for r in rows if r[0]==b and r[1]==10.0]
-        avg_gain.append(sum(g)/len(g) if g else 0.0)
+    bands = sorted(gain_10w)
+    avg_gain = [sum(gain_10w[b])/len(gain_10w[b]) for b in bands]
     bar_plot([str(b) for b in bands], avg_gain, "Average Gain @10W", "Band (m)", "Gain (dB)", (outdir/"gain_bar.png").as_posix())
     write_context(outdir, {"suite":"gain_band","drive_levels":drive_levels,"bands":bands})
     res.logs.append("Gain per band computed (stub Pout if simulation).")
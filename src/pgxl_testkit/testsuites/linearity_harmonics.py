@@ -1,44 +1,50 @@
 
-import csv, math
-from ..runners.runner import TestCase, TestCaseResult
+import csv
+from concurrent.futures import ThreadPoolExecutor
+from ..runners.runner import TestCase, TestCaseResult, instruments
 from ..config import AppConfig
 from ..devices.pgxl import PGXL
 from ..devices.flex import FlexRadio
-from ..instruments.siglent import SiglentSVA
-from ..instruments.rigol import RigolVNA
+from ..instruments.vna_base import connect_vna
 from ..utils.artifacts import new_run_dir, write_context
-from ..utils.plots import bar_plot
-
-def _connect_sa(cfg: AppConfig):
-    v = cfg.vna.vendor.lower()
-    if v == 'siglent':
-        vna = SiglentSVA(cfg.vna.visa.resource, cfg.vna.visa.timeout_ms)
-    else:
-        vna = RigolVNA(cfg.vna.visa.resource, cfg.vna.visa.timeout_ms)
-    vna.connect()
-    return vna
 
 def linearity_harmonics(cfg: AppConfig, res: TestCaseResult) -> None:
+    from ..utils.plots import bar_plot
     outdir = new_run_dir("linearity_harmonics")
-    pg = PGXL(cfg.pgxl.host, cfg.pgxl.port, cfg.pgxl.model); pg.connect()
-    fx = FlexRadio(cfg.flex.host, cfg.flex.port) if cfg.flex else None
-    sa = _connect_sa(cfg)
 
     band = 20  # demo: 20m
     fc = 14.2e6
     tone = 700.0  # Hz spacing
     rbw = 1000.0
-    if fx:
-        fx.set_band(band); fx.set_mode("USB"); fx.set_two_tone(True)
 
-    sa.sa_config(fc, 100e3, rbw)
+    def setup_flex():
+        fx = instruments.get(FlexRadio, cfg.flex.host, cfg.flex.port)
+        fx.apply(band_m=band, mode="USB"); fx.set_two_tone(True)
+        return fx
+
+    def setup_sa():
+        sa = connect_vna(cfg)
+        sa.sa_config(fc, 100e3, rbw)
+        return sa
+
+    # the instruments are independent until the measurement, so their connect
+    # and setup round-trips overlap instead of queueing behind each other
+    with ThreadPoolExecutor(max_workers=3) as ex:
+        setups = [ex.submit(instruments.get, PGXL, cfg.pgxl.host, cfg.pgxl.port), ex.submit(setup_sa)]
+        if cfg.flex: setups.append(ex.submit(setup_flex))
+        for fut in setups: fut.result()
+    sa = setups[1].result()
+    fx = setups[2].result() if cfg.flex else None
+
     # markers at tones and IMD3 products:
     freqs = [fc - tone, fc + tone, fc - 3*tone, fc + 3*tone]
-    levs = sa.sa_marker_read(freqs)
+    lo, hi, lo3, hi3 = sa.sa_marker_read(freqs)
+    # the radio is shared with later suites; don't leave it in two-tone
+    if fx: fx.set_two_tone(False)
 
-    # compute IMD3 (dBc) relative to tone level
-    tone_level = (levs[0] + levs[1]) / 2.0 if all(v==v for v in levs[:2]) else float('nan')
-    imd3 = (levs[2] + levs[3]) / 2.0 - tone_level if all(v==v for v in levs) else float('nan')
+    # compute IMD3 (dBc) relative to tone level; a nan reading propagates
+    tone_level = (lo + hi) / 2.0
+    imd3 = (lo3 + hi3) / 2.0 - tone_level
 
     with (outdir / "imd.csv").open("w", newline="") as f:
         w = csv.writer(f); w.writerow(["band_m","fc_hz","tone_hz","rbw_hz","tone_level_dbm","imd3_dbc"]); w.writerow([band, int(fc), int(tone), int(rbw), tone_level, imd3])
@@ -49,7 +55,7 @@ def linearity_harmonics(cfg: AppConfig, res: TestCaseResult) -> None:
     harmonics = [2,3,4,5]
     harm_levels = [-50.0, -60.0, -70.0, -75.0]  # simulated
     with (outdir / "harmonics.csv").open("w", newline="") as f:
-        w = csv.writer(f); w.writerow(["harmonic_n","level_dbc"]); [w.writerow([n, lvl]) for n,lvl in zip(harmonics, harm_levels)]
+        w = csv.writer(f); w.writerow(["harmonic_n","level_dbc"]); w.writerows(zip(harmonics, harm_levels))
     bar_plot([str(n) for n in harmonics], harm_levels, "Harmonics (rel dBc)", "n", "dBc", (outdir/"harmonics.png").as_posix())
 
     write_context(outdir, {"suite":"linearity_harmonics","fc":fc,"tone":tone,"rbw":rbw})
@@ -1,9 +1,27 @@
 
 import pathlib, datetime, json
+try:
+    import orjson
+except Exception:
+    orjson = None
 def new_run_dir(suite: str) -> pathlib.Path:
-    ts = datetime.datetime.now().strftime('%Y%m%d_%H%M%S')
-    p = pathlib.Path('artifacts') / suite / ts
-    p.mkdir(parents=True, exist_ok=True)
-    return p
+    # millisecond stamp; mkdir without exist_ok claims the name atomically, so two
+    # runs started in the same millisecond get _1, _2, ... suffixes
+    ts = datetime.datetime.now().strftime('%Y%m%d_%H%M%S_%f')[:-3]
+    base = pathlib.Path('artifacts') / suite
+    base.mkdir(parents=True, exist_ok=True)
+    p, n = base / ts, 0
+    while True:
+        try:
+            p.mkdir()
+            return p
+        except FileExistsError:
+            n += 1
+            p = base / f"{ts}_{n}"
 def write_context(outdir: pathlib.Path, context: dict) -> None:
-    (outdir / 'context.json').write_text(json.dumps(context, indent=2))
+    # orjson encodes straight to UTF-8 bytes; same indented layout either way
+    if orjson is not None:
+        data = orjson.dumps(context, option=orjson.OPT_INDENT_2)
+    else:
+        data = json.dumps(context, indent=2).encode()
+    (outdir / 'context.json').write_bytes(data)
@@ -1,20 +1,25 @@
 
-import matplotlib.pyplot as plt
+# Figures are built with the object-oriented API and rendered by Agg directly:
+# no pyplot state machine, no GUI backend probing, and no global figure
+# registry.
+from matplotlib.figure import Figure
+from matplotlib.backends.backend_agg import FigureCanvasAgg
 
-def line_plot(x, y, title, xlabel, ylabel, path):
-    fig = plt.figure()
-    plt.plot(x, y)
-    plt.title(title)
-    plt.xlabel(xlabel)
-    plt.ylabel(ylabel)
+def _save(fig: Figure, ax, title, xlabel, ylabel, path) -> None:
+    ax.set_title(title)
+    ax.set_xlabel(xlabel)
+    ax.set_ylabel(ylabel)
+    FigureCanvasAgg(fig)
     fig.savefig(path, dpi=120, bbox_inches="tight")
-    plt.close(fig)
+
+def line_plot(x, y, title, xlabel, ylabel, path):
+    fig = Figure()
+    ax = fig.add_subplot()
+    ax.plot(x, y)
+    _save(fig, ax, title, xlabel, ylabel, path)
 
 def bar_plot(labels, values, title, xlabel, ylabel, path):
-    fig = plt.figure()
-    plt.bar(labels, values)
-    plt.title(title)
-    plt.xlabel(xlabel)
-    plt.ylabel(ylabel)
-    fig.savefig(path, dpi=120, bbox_inches="tight")
-    plt.close(fig)
+    fig = Figure()
+    ax = fig.add_subplot()
+    ax.bar(labels, values)
+    _save(fig, ax, title, xlabel, ylabel, path)
@@ -1,8 +1,30 @@
 
-from typing import Iterable
-def checklist_confirm(intro: str, items: Iterable[str]) -> bool:
+from typing import Iterable, Optional
+import os, select, sys
+
+CHECKLIST_TIMEOUT_S = 120.0
+
+def checklist_confirm(intro: str, items: Iterable[str], timeout_s: Optional[float] = CHECKLIST_TIMEOUT_S) -> Optional[bool]:
+    """Ask the tech to confirm a setup checklist.
+
+    Returns True on 'YES', False on any other answer, and None if nobody
+    answered within timeout_s (None waits forever). PGXL_ASSUME_CHECKLIST=1
+    confirms without prompting, for unattended runs.
+    """
     print(intro)
     for i, item in enumerate(items, 1):
         print(f"  [{i}] {item}")
-    ans = input("Type 'YES' to confirm all steps are complete: ").strip().upper()
-    return ans == 'YES'
+    if os.environ.get("PGXL_ASSUME_CHECKLIST") == "1":
+        print("Checklist confirmed by PGXL_ASSUME_CHECKLIST=1.")
+        return True
+    prompt = "Type 'YES' to confirm all steps are complete: "
+    try:
+        print(prompt, end="", flush=True)
+        ready, _, _ = select.select([sys.stdin], [], [], timeout_s)
+    except (OSError, ValueError):
+        # stdin can't be polled (Windows console, replaced stream): wait as before
+        return input().strip().upper() == 'YES'
+    if not ready:
+        print("\nChecklist timed out.")
+        return None
+    return sys.stdin.readline().strip().upper() == 'YES'